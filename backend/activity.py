@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import bindparam, or_, update
+
+from .database import License, get_async_session
+
+log = logging.getLogger("backend.activity")
+
+_licenses = License.__table__
+_TOUCH = (
+    update(_licenses)
+    .where(_licenses.c.key == bindparam("b_key"))
+    .where(or_(_licenses.c.updated_at.is_(None), _licenses.c.updated_at < bindparam("b_seen")))
+    .values(updated_at=bindparam("b_seen"))
+)
+
+
+class LastSeenTracker:
+    """Batches "last seen" timestamps of validated licenses into periodic updates."""
+
+    def __init__(self, flush_interval: float = 30.0):
+        self.flush_interval = flush_interval
+        self.written = 0
+        self._pending: Dict[str, datetime] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stop = asyncio.Event()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def touch(self, license_key: str, seen: Optional[datetime] = None) -> None:
+        self._pending[license_key] = seen or datetime.utcnow()
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, {}
+            try:
+                async with get_async_session() as session:
+                    await session.execute(_TOUCH, [{"b_key": key, "b_seen": seen} for key, seen in pending.items()])
+                    await session.commit()
+            except Exception:
+                for key, seen in pending.items():
+                    current = self._pending.get(key)
+                    if current is None or current < seen:
+                        self._pending[key] = seen
+                log.exception("Failed to write last-seen times for %d licenses, will retry", len(pending))
+                return 0
+            self.written += len(pending)
+            return len(pending)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._stop = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._stop.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {"pending": self.pending, "written": self.written, "flush_interval": self.flush_interval}
+
+    async def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
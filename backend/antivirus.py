@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import mmap
+import os
+import shutil
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .hashformat import DIGEST_SIZE, HEADER, MAGIC, VERSION, digests_offset, parse_hex_digests, write_hash_database
+
+
+def read_digests(path: Path) -> Iterator[bytes]:
+    with path.open("rb") as fp:
+        if os.fstat(fp.fileno()).st_size < HEADER.size:
+            return
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            magic, version, _, count, bloom_bits, _, _ = HEADER.unpack_from(mapped, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a version {VERSION} hash database")
+            offset = digests_offset(bloom_bits)
+            for index in range(count):
+                start = offset + index * DIGEST_SIZE
+                yield mapped[start : start + DIGEST_SIZE]
+
+
+def diff_sorted(old: Iterator[bytes], new: Iterator[bytes]) -> Tuple[List[bytes], List[bytes]]:
+    """Linear merge of two sorted digest streams into (added, removed)."""
+    added: List[bytes] = []
+    removed: List[bytes] = []
+    old_item, new_item = next(old, None), next(new, None)
+    while old_item is not None or new_item is not None:
+        if new_item is None or (old_item is not None and old_item < new_item):
+            removed.append(old_item)
+            old_item = next(old, None)
+        elif old_item is None or new_item < old_item:
+            added.append(new_item)
+            new_item = next(new, None)
+        else:
+            old_item, new_item = next(old, None), next(new, None)
+    return added, removed
+
+
+class AntivirusStore:
+    """Compiles the text hash list into the binary format and keeps recent versions for deltas."""
+
+    def __init__(self, source: Path, history_size: int = 10):
+        self.source = source
+        self.compiled = source.with_suffix(".bin")
+        self.versions_dir = source.parent / "antivirus_versions"
+        self.history_size = history_size
+        self.etag: Optional[str] = None
+        self._source_stat: Optional[Tuple[int, int]] = None
+        self._deltas: Dict[str, dict] = {}
+        self._lock = Lock()
+
+    def refresh(self) -> str:
+        """Recompile when the text source changed; returns the current ETag."""
+        with self._lock:
+            if not self.source.exists():
+                self.source.touch()
+            stat = self.source.stat()
+            if self.etag is not None and (stat.st_mtime_ns, stat.st_size) == self._source_stat:
+                return self.etag
+            with self.source.open("r", encoding="utf-8") as fp:
+                etag = write_hash_database(parse_hex_digests(fp), self.compiled)
+            self.versions_dir.mkdir(parents=True, exist_ok=True)
+            version_path = self.versions_dir / f"{etag}.bin"
+            if not version_path.exists():
+                shutil.copyfile(self.compiled, version_path)
+            os.utime(version_path)
+            self._prune_versions()
+            self.etag = etag
+            self._source_stat = (stat.st_mtime_ns, stat.st_size)
+            self._deltas.clear()
+            return etag
+
+    def version_path(self, etag: str) -> Optional[Path]:
+        if not etag.isalnum():
+            return None
+        path = self.versions_dir / f"{etag}.bin"
+        return path if path.exists() else None
+
+    def delta(self, since: str) -> Optional[dict]:
+        etag = self.refresh()
+        if since == etag:
+            return {"etag": etag, "added": [], "removed": []}
+        cached = self._deltas.get(since)
+        if cached is not None:
+            return cached
+        base = self.version_path(since)
+        current = self.version_path(etag)
+        if base is None or current is None:
+            return None
+        added, removed = diff_sorted(read_digests(base), read_digests(current))
+        result = {"etag": etag, "added": [digest.hex() for digest in added], "removed": [digest.hex() for digest in removed]}
+        self._deltas[since] = result
+        return result
+
+    def _prune_versions(self) -> None:
+        versions = sorted(self.versions_dir.glob("*.bin"), key=lambda path: path.stat().st_mtime_ns, reverse=True)
+        for stale in versions[self.history_size :]:
+            stale.unlink(missing_ok=True)
@@ -1,29 +1,148 @@
 from __future__ import annotations
 
 import asyncio
-from datetime import datetime
+import hmac
+import logging
+import math
+from contextlib import asynccontextmanager
+from datetime import date, datetime, time, timedelta
 from pathlib import Path
-from typing import List
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
-import uvicorn
-from fastapi import Depends, FastAPI, HTTPException, Request, status
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from .database import AuditLog, License, get_license, get_session
+from jose import JWTError
+from sqlalchemy import Row, Select, func, or_, select, tuple_, update
+
+from . import metrics
+from .activity import LastSeenTracker
+from .antivirus import AntivirusStore
+from .audit import AuditSink
+from .bulk import LicenseImporter, export_licenses, parse_csv, parse_ndjson
+from .cache import ValidationCache
+from .database import (
+    AuditLog,
+    AuditLogSummary,
+    License,
+    async_engine,
+    dispose_engines,
+    effective_pragmas,
+    get_async_session,
+    get_license_async,
+    init_db,
+)
+from .expiry import ExpirySweeper
 from .models import (
     AuditLogResponse,
+    AuditLogSummaryResponse,
+    LicenseBatchValidationRequest,
+    LicenseBatchValidationResponse,
     LicenseCreate,
+    LicenseImportResponse,
     LicenseResponse,
     LicenseUpdate,
     LicenseValidationRequest,
     LicenseValidationResponse,
 )
-from .security import create_access_token, decode_access_token
+from .ratelimit import MemoryBucketStore, RateLimiter, SQLiteBucketStore
+from .retention import AuditRetention
+from .security import create_access_token, revoke_access_token, token_cache, verify_access_token
+from .shared import SharedState
+from .serialization import (
+    AUDIT_LOG_COLUMNS,
+    AUDIT_LOG_FIELDS,
+    LICENSE_COLUMNS,
+    LICENSE_FIELDS,
+    json_response,
+    license_payload,
+    ndjson_line,
+    row_payload,
+)
 from .settings import get_settings
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_BATCH_SIZE = 500
+DEFAULT_SHARED_STATE_PATH = Path(__file__).resolve().parent / "shared_state.db"
+
+log = logging.getLogger("backend.app")
 settings = get_settings()
-app = FastAPI(title=settings.app_name)
+
+
+def configure_logging() -> None:
+    """Give the ``backend`` loggers a handler: uvicorn and gunicorn only set up their own."""
+    root = logging.getLogger("backend")
+    if root.handlers or logging.getLogger().handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s [%(process)d] [%(levelname)s] %(name)s: %(message)s"))
+    root.addHandler(handler)
+    root.setLevel(settings.log_level.upper())
+
+
+configure_logging()
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    applied = await asyncio.to_thread(init_db)
+    if applied:
+        log.info("Applied migrations: %s", ", ".join(applied))
+    await asyncio.to_thread(antivirus_store.refresh)
+    for role, pragmas in (await effective_pragmas()).items():
+        log.info("SQLite %s pragmas: %s", role, ", ".join(f"{name}={value}" for name, value in pragmas.items()))
+    # Components publish invalidations through shared_state: it starts first and stops last.
+    if shared_state is not None:
+        await shared_state.start(on_invalidate=validation_cache.invalidate, on_revoke=token_cache.revoke_digest)
+    await audit_sink.start()
+    await audit_retention.start()
+    await last_seen.start()
+    await expiry_sweeper.start()
+    try:
+        yield
+    finally:
+        await expiry_sweeper.stop()
+        await last_seen.stop()
+        await audit_retention.stop()
+        await audit_sink.stop()
+        if shared_state is not None:
+            await shared_state.stop()
+        await dispose_engines()
+
+
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
 security = HTTPBearer()
+validation_cache = ValidationCache(settings.validation_cache_size, settings.validation_cache_ttl_seconds)
+shared_state_path = settings.shared_state_path or (DEFAULT_SHARED_STATE_PATH if settings.workers > 1 else None)
+shared_state = SharedState(shared_state_path, settings.shared_state_poll_interval) if shared_state_path else None
+rate_limit_path = settings.rate_limit_shared_path or shared_state_path
+rate_limiter = RateLimiter(
+    settings.rate_limit_per_minute,
+    burst=settings.rate_limit_burst,
+    store=(
+        SQLiteBucketStore(rate_limit_path, settings.rate_limit_max_clients)
+        if rate_limit_path
+        else MemoryBucketStore(settings.rate_limit_max_clients)
+    ),
+)
+antivirus_store = AntivirusStore(Path(settings.antivirus_hash_db), settings.antivirus_history_size)
+audit_sink = AuditSink(
+    mode=settings.audit_mode,
+    batch_size=settings.audit_batch_size,
+    flush_interval=settings.audit_flush_interval_seconds,
+    max_buffer=settings.audit_max_buffer,
+)
+last_seen = LastSeenTracker(settings.last_seen_flush_interval_seconds)
+audit_retention = AuditRetention(
+    settings.audit_retention_days,
+    settings.audit_archive_dir,
+    interval=settings.audit_retention_interval_seconds,
+    batch_size=settings.audit_retention_batch_size,
+    pause=settings.audit_retention_pause_seconds,
+    segment_rows=settings.audit_archive_segment_rows,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -32,23 +151,52 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if settings.metrics_enabled:
+    app.add_middleware(metrics.MetricsMiddleware)
+    metrics.registry.gauge(
+        "ulb_rate_limit_rejections_total", "Requests rejected by the rate limiter.", lambda: rate_limiter.rejections, kind="counter"
+    )
+    metrics.registry.gauge("ulb_validation_cache_hits_total", "Validation cache hits.", lambda: validation_cache.hits, kind="counter")
+    metrics.registry.gauge("ulb_validation_cache_misses_total", "Validation cache misses.", lambda: validation_cache.misses, kind="counter")
+    metrics.registry.gauge("ulb_validation_cache_entries", "Entries in the validation cache.", lambda: validation_cache.stats()["entries"])
+    metrics.registry.gauge("ulb_audit_pending_rows", "Audit rows waiting in the write-behind buffer.", lambda: audit_sink.pending)
+    metrics.registry.gauge("ulb_last_seen_pending", "Last-seen timestamps waiting for the next batched write.", lambda: last_seen.pending)
+    metrics.registry.gauge(
+        "ulb_licenses_expired_total", "Licenses deactivated by the expiry sweeper.", lambda: expiry_sweeper.expired, kind="counter"
+    )
+    metrics.registry.gauge("ulb_db_connections_in_use", "Writer pool connections checked out.", lambda: async_engine.pool.checkedout())
+
+
+async def invalidate_license(license_key: str) -> None:
+    validation_cache.invalidate(license_key)
+    if shared_state is not None:
+        await shared_state.publish_invalidation(license_key)
+
+
+expiry_sweeper = ExpirySweeper(
+    invalidate_license,
+    interval=settings.expiry_sweep_interval_seconds,
+    batch_size=settings.expiry_sweep_batch_size,
+)
 
 
 async def rate_limit(request: Request) -> None:
-    bucket = request.client.host
-    store = request.app.state.__dict__.setdefault("rate_limit", {})
-    history = store.setdefault(bucket, [])
-    now = datetime.utcnow()
-    history[:] = [ts for ts in history if (now - ts).seconds < 60]
-    if len(history) >= settings.rate_limit_per_minute:
-        await asyncio.sleep(1)
-        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="Rate limit exceeded")
-    history.append(now)
+    client = request.client.host if request.client else "unknown"
+    retry_after = await rate_limiter.hit(client)
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
 
 
 async def authorize(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
     token = credentials.credentials
-    payload = decode_access_token(token)
+    try:
+        payload = verify_access_token(token)
+    except JWTError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or revoked token")
     return payload["sub"]
 
 
@@ -60,10 +208,22 @@ async def issue_token(password: str):
     return {"token": token, "expires": expires}
 
 
+@app.post("/auth/revoke")
+async def revoke_token(
+    token: Optional[str] = None,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    _: str = Depends(authorize),
+):
+    digest, until = revoke_access_token(token or credentials.credentials)
+    if shared_state is not None:
+        await shared_state.publish_revocation(digest, until)
+    return {"status": "revoked"}
+
+
 @app.post("/licenses", response_model=LicenseResponse, dependencies=[Depends(rate_limit)])
 async def create_license(data: LicenseCreate, _: str = Depends(authorize)):
-    with get_session() as session:
-        if get_license(session, data.key):
+    async with get_async_session() as session:
+        if await get_license_async(session, data.key):
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="License key already exists")
         license_obj = License(
             key=data.key,
@@ -73,115 +233,377 @@ async def create_license(data: LicenseCreate, _: str = Depends(authorize)):
             notes=data.notes,
         )
         session.add(license_obj)
-        session.add(
-            AuditLog(
-                license_key=data.key,
-                action="create",
-                actor="admin",
-                message=f"License created for {data.owner}",
-            )
+        await audit_sink.record(
+            session,
+            license_key=data.key,
+            action="create",
+            actor="admin",
+            message=f"License created for {data.owner}",
         )
-        session.commit()
-        session.refresh(license_obj)
-        return license_obj
+        await session.commit()
+        await session.refresh(license_obj)
+        await invalidate_license(data.key)
+        return json_response(license_payload(license_obj))
+
+
+def _license_query(
+    cursor: Optional[int],
+    owner: Optional[str],
+    active: Optional[bool],
+    banned: Optional[bool],
+    expires_before: Optional[datetime],
+) -> Select:
+    query = select(License).order_by(License.id)
+    if cursor is not None:
+        query = query.where(License.id > cursor)
+    if owner is not None:
+        query = query.where(License.owner == owner)
+    if active is not None:
+        query = query.where(License.is_active == active)
+    if banned is not None:
+        query = query.where(License.banned == banned)
+    if expires_before is not None:
+        query = query.where(License.expires_at < expires_before)
+    return query
+
+
+async def _iter_licenses(query: Select) -> AsyncIterator[License]:
+    async with get_async_session(readonly=True) as session:
+        rows = await session.stream_scalars(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+        async for license_obj in rows:
+            yield license_obj
+
+
+async def _stream_licenses(query: Select) -> AsyncIterator[bytes]:
+    async with get_async_session(readonly=True) as session:
+        rows = await session.stream(query.with_only_columns(*LICENSE_COLUMNS).execution_options(yield_per=STREAM_BATCH_SIZE))
+        async for row in rows:
+            yield ndjson_line(row_payload(LICENSE_FIELDS, row))
 
 
 @app.get("/licenses", response_model=List[LicenseResponse])
-async def list_licenses(_: str = Depends(authorize)):
-    with get_session() as session:
-        return session.query(License).all()
+async def list_licenses(
+    cursor: Optional[int] = Query(None, ge=0, description="Return licenses with an id greater than this cursor"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    owner: Optional[str] = None,
+    active: Optional[bool] = None,
+    banned: Optional[bool] = None,
+    expires_before: Optional[datetime] = None,
+    format: str = Query("json", regex="^(json|ndjson)$"),
+    _: str = Depends(authorize),
+):
+    query = _license_query(cursor, owner, active, banned, expires_before)
+    if format == "ndjson":
+        if limit is not None:
+            query = query.limit(limit)
+        return StreamingResponse(_stream_licenses(query), media_type="application/x-ndjson")
+    page_size = limit or DEFAULT_PAGE_SIZE
+    async with get_async_session(readonly=True) as session:
+        result = await session.execute(query.with_only_columns(License.id, *LICENSE_COLUMNS).limit(page_size + 1))
+        rows = result.all()
+    headers = {}
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        headers["X-Next-Cursor"] = str(rows[-1].id)
+    return json_response([row_payload(LICENSE_FIELDS, row[1:]) for row in rows], headers)
+
+
+@app.post("/licenses/import", response_model=LicenseImportResponse)
+async def import_licenses(
+    request: Request,
+    format: Optional[str] = Query(None, regex="^(csv|ndjson)$", description="Defaults to the Content-Type of the upload"),
+    batch_size: int = Query(500, ge=1, le=5000),
+    _: str = Depends(authorize),
+):
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        if "csv" in content_type:
+            format = "csv"
+        elif "json" in content_type:
+            format = "ndjson"
+        else:
+            raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Send text/csv or application/x-ndjson")
+    parser = parse_csv if format == "csv" else parse_ndjson
+    importer = LicenseImporter(audit_sink, invalidate_license, batch_size=batch_size)
+    return await importer.run(parser(request.stream()))
+
+
+@app.get("/licenses/export")
+async def export_licenses_endpoint(
+    format: str = Query("ndjson", regex="^(csv|ndjson)$"),
+    owner: Optional[str] = None,
+    active: Optional[bool] = None,
+    banned: Optional[bool] = None,
+    expires_before: Optional[datetime] = None,
+    _: str = Depends(authorize),
+):
+    query = _license_query(None, owner, active, banned, expires_before)
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    headers = {"Content-Disposition": f'attachment; filename="licenses.{format}"'}
+    return StreamingResponse(export_licenses(_iter_licenses(query), format), media_type=media_type, headers=headers)
 
 
 @app.get("/licenses/{license_key}", response_model=LicenseResponse)
 async def get_license_route(license_key: str, _: str = Depends(authorize)):
-    with get_session() as session:
-        license_obj = get_license(session, license_key)
+    async with get_async_session(readonly=True) as session:
+        license_obj = await get_license_async(session, license_key)
         if not license_obj:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="License not found")
-        return license_obj
+        return json_response(license_payload(license_obj))
 
 
 @app.put("/licenses/{license_key}", response_model=LicenseResponse)
 async def update_license(license_key: str, data: LicenseUpdate, _: str = Depends(authorize)):
-    with get_session() as session:
-        license_obj = get_license(session, license_key)
+    async with get_async_session() as session:
+        license_obj = await get_license_async(session, license_key)
         if not license_obj:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="License not found")
         for field, value in data.dict(exclude_unset=True).items():
             setattr(license_obj, field, value)
-        session.add(
-            AuditLog(
-                license_key=license_key,
-                action="update",
-                actor="admin",
-                message=f"Fields updated: {', '.join(data.dict(exclude_unset=True).keys())}",
-            )
+        await audit_sink.record(
+            session,
+            license_key=license_key,
+            action="update",
+            actor="admin",
+            message=f"Fields updated: {', '.join(data.dict(exclude_unset=True).keys())}",
         )
-        session.commit()
-        session.refresh(license_obj)
-        return license_obj
+        await session.commit()
+        await invalidate_license(license_key)
+        await session.refresh(license_obj)
+        return json_response(license_payload(license_obj))
 
 
 @app.delete("/licenses/{license_key}")
 async def delete_license(license_key: str, _: str = Depends(authorize)):
-    with get_session() as session:
-        license_obj = get_license(session, license_key)
+    async with get_async_session() as session:
+        license_obj = await get_license_async(session, license_key)
         if not license_obj:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="License not found")
-        session.delete(license_obj)
-        session.add(
-            AuditLog(
-                license_key=license_key,
-                action="delete",
-                actor="admin",
-                message="License deleted",
-            )
+        await session.delete(license_obj)
+        await audit_sink.record(
+            session,
+            license_key=license_key,
+            action="delete",
+            actor="admin",
+            message="License deleted",
         )
-        session.commit()
+        await session.commit()
+        await invalidate_license(license_key)
         return {"status": "deleted"}
 
 
+async def _bind_guild(license_obj: License, guild_id: str) -> None:
+    # Conditional update: if two guilds race for an unbound license only one of them wins.
+    async with get_async_session() as session:
+        result = await session.execute(
+            update(License)
+            .where(License.id == license_obj.id, or_(License.guild_id.is_(None), License.guild_id == ""))
+            .values(guild_id=guild_id, updated_at=datetime.utcnow()),
+            execution_options={"synchronize_session": False},
+        )
+        if result.rowcount:
+            await session.commit()
+            license_obj.guild_id = guild_id
+            return
+        license_obj.guild_id = await session.scalar(select(License.guild_id).where(License.id == license_obj.id))
+
+
+async def _record_validation(key: str, guild_id: str) -> None:
+    last_seen.touch(key)
+    await audit_sink.record(
+        None,
+        license_key=key,
+        action="validate",
+        actor="bot",
+        message=f"Validation succeeded for guild {guild_id}",
+    )
+
+
+async def _resolve_validation(license_obj: Optional[License], key: str, guild_id: str) -> LicenseValidationResponse:
+    if not license_obj:
+        return LicenseValidationResponse(valid=False, reason="License not found", expires_at=None)
+    if not license_obj.is_active or license_obj.banned:
+        return LicenseValidationResponse(valid=False, reason="License inactive", expires_at=license_obj.expires_at)
+    if license_obj.expires_at and license_obj.expires_at < datetime.utcnow():
+        # The expiry sweeper deactivates the row in bulk; the request stays read-only.
+        return LicenseValidationResponse(valid=False, reason="License expired", expires_at=license_obj.expires_at)
+    if not license_obj.guild_id:
+        await _bind_guild(license_obj, guild_id)
+    if license_obj.guild_id != guild_id:
+        return LicenseValidationResponse(valid=False, reason="License bound to another guild", expires_at=license_obj.expires_at)
+    await _record_validation(key, guild_id)
+    return LicenseValidationResponse(valid=True, reason="Valid", expires_at=license_obj.expires_at)
+
+
 @app.post("/licenses/validate", response_model=LicenseValidationResponse, dependencies=[Depends(rate_limit)])
 async def validate_license(data: LicenseValidationRequest):
-    with get_session() as session:
-        license_obj = get_license(session, data.key)
-        if not license_obj:
-            return LicenseValidationResponse(valid=False, reason="License not found", expires_at=None)
-        if not license_obj.is_active or license_obj.banned:
-            return LicenseValidationResponse(valid=False, reason="License inactive", expires_at=license_obj.expires_at)
-        if license_obj.expires_at and license_obj.expires_at < datetime.utcnow():
-            license_obj.is_active = False
-            session.commit()
-            return LicenseValidationResponse(valid=False, reason="License expired", expires_at=license_obj.expires_at)
-        if license_obj.guild_id and license_obj.guild_id != data.guild_id:
-            return LicenseValidationResponse(valid=False, reason="License bound to another guild", expires_at=license_obj.expires_at)
-        if not license_obj.guild_id:
-            license_obj.guild_id = data.guild_id
-        license_obj.updated_at = datetime.utcnow()
-        session.add(
-            AuditLog(
-                license_key=data.key,
-                action="validate",
-                actor="bot",
-                message=f"Validation succeeded for guild {data.guild_id}",
-            )
-        )
-        session.commit()
-        return LicenseValidationResponse(valid=True, reason="Valid", expires_at=license_obj.expires_at)
+    cached = validation_cache.get(data.key, data.guild_id)
+    if cached is not None:
+        if cached.valid:
+            await _record_validation(data.key, data.guild_id)
+        return json_response(cached)
+    async with get_async_session(readonly=True) as session:
+        license_obj = await get_license_async(session, data.key)
+    decision = await _resolve_validation(license_obj, data.key, data.guild_id)
+    validation_cache.set(data.key, data.guild_id, decision)
+    return json_response(decision)
+
+
+@app.post("/licenses/validate/batch", response_model=LicenseBatchValidationResponse, dependencies=[Depends(rate_limit)])
+async def validate_license_batch(data: LicenseBatchValidationRequest):
+    results: List[Optional[LicenseValidationResponse]] = []
+    for item in data.items:
+        cached = validation_cache.get(item.key, item.guild_id)
+        if cached is not None and cached.valid:
+            await _record_validation(item.key, item.guild_id)
+        results.append(cached)
+    pending = [index for index, result in enumerate(results) if result is None]
+    if pending:
+        keys = {data.items[index].key for index in pending}
+        async with get_async_session(readonly=True) as session:
+            rows = await session.execute(select(License).where(License.key.in_(keys)))
+            licenses = {license_obj.key: license_obj for license_obj in rows.scalars()}
+        for index in pending:
+            item = data.items[index]
+            results[index] = await _resolve_validation(licenses.get(item.key), item.key, item.guild_id)
+            validation_cache.set(item.key, item.guild_id, results[index])
+    return json_response({"results": [result.dict() for result in results]})
+
+
+@app.get("/cache/stats")
+async def cache_stats(_: str = Depends(authorize)):
+    return validation_cache.stats()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint(request: Request):
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Metrics are disabled")
+    if settings.metrics_token:
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        if not hmac.compare_digest(supplied, settings.metrics_token):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/storage/stats")
+async def storage_stats(_: str = Depends(authorize)):
+    return {"profile": settings.sqlite_profile, "pragmas": await effective_pragmas()}
+
+
+@app.get("/ratelimit/stats")
+async def rate_limit_stats(_: str = Depends(authorize)):
+    return rate_limiter.stats()
+
+
+@app.get("/audit/stats")
+async def audit_stats(_: str = Depends(authorize)):
+    return {**audit_sink.stats(), "retention": audit_retention.stats()}
+
+
+def _encode_log_cursor(log_entry: Row) -> str:
+    return f"{log_entry.created_at.isoformat()}|{log_entry.id}"
+
+
+def _decode_log_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, log_id = cursor.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(log_id)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
 
 
 @app.get("/licenses/{license_key}/logs", response_model=List[AuditLogResponse])
-async def license_logs(license_key: str, _: str = Depends(authorize)):
-    with get_session() as session:
-        logs = session.query(AuditLog).filter(AuditLog.license_key == license_key).order_by(AuditLog.created_at.desc()).all()
-        return logs
+async def license_logs(
+    license_key: str,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    action: Optional[str] = None,
+    _: str = Depends(authorize),
+):
+    await audit_sink.flush()
+    query = (
+        select(AuditLog.id, *AUDIT_LOG_COLUMNS)
+        .where(AuditLog.license_key == license_key)
+        .order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        query = query.where(tuple_(AuditLog.created_at, AuditLog.id) < tuple_(*_decode_log_cursor(cursor)))
+    if since is not None:
+        query = query.where(AuditLog.created_at >= since)
+    if until is not None:
+        query = query.where(AuditLog.created_at < until)
+    if action is not None:
+        query = query.where(AuditLog.action == action)
+    async with get_async_session(readonly=True) as session:
+        result = await session.execute(query)
+        rows = result.all()
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = _encode_log_cursor(rows[-1])
+    return json_response([row_payload(AUDIT_LOG_FIELDS, row[1:]) for row in rows], headers)
+
+
+@app.get("/licenses/{license_key}/logs/summary", response_model=List[AuditLogSummaryResponse])
+async def license_logs_summary(
+    license_key: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    _: str = Depends(authorize),
+):
+    await audit_sink.flush()
+    day = func.date(AuditLog.created_at).label("day")
+    query = (
+        select(day, AuditLog.action, func.count().label("count"))
+        .where(AuditLog.license_key == license_key)
+        .group_by(day, AuditLog.action)
+    )
+    # Rows past retention only survive as daily counts: fold those in at day granularity.
+    archived = select(AuditLogSummary.day, AuditLogSummary.action, AuditLogSummary.count).where(
+        AuditLogSummary.license_key == license_key
+    )
+    if since is not None:
+        query = query.where(AuditLog.created_at >= since)
+        archived = archived.where(AuditLogSummary.day >= since.date())
+    if until is not None:
+        query = query.where(AuditLog.created_at < until)
+        last_day = until.date() if until.time() != time() else until.date() - timedelta(days=1)
+        archived = archived.where(AuditLogSummary.day <= last_day)
+    counts: Dict[Tuple[date, str], int] = {}
+    async with get_async_session(readonly=True) as session:
+        for row in await session.execute(archived):
+            counts[(row.day, row.action)] = counts.get((row.day, row.action), 0) + row.count
+        for row in await session.execute(query):
+            row_day = row.day if isinstance(row.day, date) else date.fromisoformat(row.day)
+            counts[(row_day, row.action)] = counts.get((row_day, row.action), 0) + row.count
+    ordered = sorted(counts.items(), key=lambda item: (-item[0][0].toordinal(), item[0][1]))
+    return [AuditLogSummaryResponse(day=day, action=action, count=count) for (day, action), count in ordered]
 
 
-@app.on_event("startup")
-async def ensure_antivirus_file():
-    path = Path(settings.antivirus_hash_db)
-    path.touch(exist_ok=True)
+@app.get("/antivirus/db")
+async def antivirus_db(request: Request):
+    etag = await asyncio.to_thread(antivirus_store.refresh)
+    headers = {"ETag": f'"{etag}"', "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match", "").strip('"') == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    # Serve the immutable snapshot so the body always matches the ETag.
+    path = antivirus_store.version_path(etag) or antivirus_store.compiled
+    return FileResponse(path, media_type="application/octet-stream", headers=headers)
+
+
+@app.get("/antivirus/delta")
+async def antivirus_delta(since: str):
+    delta = await asyncio.to_thread(antivirus_store.delta, since)
+    if delta is None:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Unknown base version, download /antivirus/db")
+    return delta
 
 
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run("backend.app:app", host="0.0.0.0", port=8000, reload=False)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, SessionTransaction
+
+from . import metrics
+from .database import AuditLog, get_async_session
+
+log = logging.getLogger("backend.audit")
+
+AUDIT_MODES = ("sync", "buffered")
+_PENDING_KEY = "audit_rows"
+
+
+class AuditSink:
+    """Write-behind buffer for AuditLog rows, bulk inserted by a background task."""
+
+    def __init__(self, mode: str = "buffered", batch_size: int = 500, flush_interval: float = 1.0, max_buffer: int = 50_000):
+        if mode not in AUDIT_MODES:
+            raise ValueError(f"Unknown audit mode {mode!r}, expected one of {AUDIT_MODES}")
+        self.mode = mode
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.written = 0
+        self.failed_flushes = 0
+        self._buffer: List[Dict[str, Any]] = []
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    async def record(self, session: Optional[AsyncSession], *, license_key: str, action: str, actor: str, message: str) -> None:
+        """Queue an audit row; in ``sync`` mode without a ``session`` it is committed on its own."""
+        if self.mode == "sync":
+            entry = AuditLog(license_key=license_key, action=action, actor=actor, message=message)
+            if session is None:
+                async with get_async_session() as own_session:
+                    own_session.add(entry)
+                    await own_session.commit()
+            else:
+                session.add(entry)
+            metrics.audit_rows_written.inc()
+            return
+        row = {
+            "license_key": license_key,
+            "action": action,
+            "actor": actor,
+            "message": message,
+            "created_at": datetime.utcnow(),
+        }
+        if session is not None:
+            # Queued on commit by _queue_committed_rows; never flushed from here.
+            if not session.in_transaction():
+                session.sync_session.begin()
+            session.info.setdefault(_PENDING_KEY, []).append((self, row))
+            return
+        self._enqueue(row)
+        if len(self._buffer) >= self.max_buffer:
+            # Back-pressure: never let the buffer grow past its cap.
+            await self.flush()
+
+    def _enqueue(self, row: Dict[str, Any]) -> None:
+        self._buffer.append(row)
+        if len(self._buffer) >= min(self.batch_size, self.max_buffer):
+            self._wake.set()
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            if not self._buffer:
+                return 0
+            rows, self._buffer = self._buffer, []
+            try:
+                async with get_async_session() as session:
+                    await session.execute(insert(AuditLog), rows)
+                    await session.commit()
+            except Exception:
+                self.failed_flushes += 1
+                metrics.audit_flushes.inc(("failed",))
+                self._buffer[:0] = rows[-self.max_buffer :]
+                log.exception("Failed to flush %d audit rows, will retry", len(rows))
+                return 0
+            self.written += len(rows)
+            metrics.audit_flushes.inc(("ok",))
+            metrics.audit_rows_written.inc(amount=len(rows))
+            return len(rows)
+
+    async def start(self) -> None:
+        if self.mode == "buffered" and self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._stopping = True
+            self._wake.set()
+            await self._task
+            self._task = None
+        await self.flush()
+        if self._buffer:
+            log.error("Dropping %d audit rows that could not be flushed on shutdown", len(self._buffer))
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "pending": self.pending,
+            "written": self.written,
+            "failed_flushes": self.failed_flushes,
+        }
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+
+@event.listens_for(Session, "after_commit")
+def _queue_committed_rows(session: Session) -> None:
+    for sink, row in session.info.pop(_PENDING_KEY, ()):
+        sink._enqueue(row)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_uncommitted_rows(session: Session, transaction: SessionTransaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import codecs
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from .audit import AuditSink
+from .database import License, get_async_session
+from .models import LicenseImport, LicenseImportError, LicenseImportResponse
+from .serialization import ndjson_line
+
+log = logging.getLogger("backend.bulk")
+
+IMPORT_FORMATS = ("csv", "ndjson")
+EXPORT_COLUMNS = ("key", "owner", "expires_at", "max_guilds", "guild_id", "is_active", "banned", "notes", "created_at", "updated_at")
+MAX_REPORTED_ERRORS = 1000
+
+# (line number, parsed record or None, parse error or None)
+ParsedRow = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+async def _decoded_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into text lines without holding more than one chunk in memory."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def parse_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    line_no = 0
+    async for line in _decoded_lines(chunks):
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield line_no, None, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, "Expected a JSON object"
+            continue
+        yield line_no, record, None
+
+
+async def parse_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    """Parse a CSV stream with a header row.
+
+    Quoted fields may span lines: a record is complete once the quotes seen so far are
+    balanced (an escaped ``""`` counts twice and keeps the parity).
+    """
+    header: Optional[List[str]] = None
+    record_lines: List[str] = []
+    quotes = 0
+    start_line = line_no = 0
+    async for line in _decoded_lines(chunks):
+        line_no += 1
+        if not record_lines:
+            start_line = line_no
+        record_lines.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+        text = "".join(record_lines)
+        record_lines, quotes = [], 0
+        if not text.strip():
+            continue
+        try:
+            values = next(csv.reader(io.StringIO(text)))
+        except csv.Error as exc:
+            yield start_line, None, f"Invalid CSV: {exc}"
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) > len(header):
+            yield start_line, None, f"Expected at most {len(header)} columns, got {len(values)}"
+            continue
+        # Empty cells fall back to the LicenseImport defaults.
+        yield start_line, {name: value for name, value in zip(header, values) if value != ""}, None
+    if record_lines:
+        yield start_line, None, "Unterminated quoted field"
+
+
+class LicenseImporter:
+    """Validates parsed rows with ``LicenseImport`` and inserts them in chunked transactions.
+
+    Each chunk checks its keys against the database with one IN query, then inserts the
+    new ones with a single executemany and commits. Invalid rows and duplicates are
+    reported individually; they never abort the rest of the import. Audit entries are
+    recorded in the insert transaction, so a chunk that rolls back leaves none behind.
+    """
+
+    def __init__(
+        self,
+        audit_sink: AuditSink,
+        on_created: Callable[[str], Awaitable[None]],
+        batch_size: int = 500,
+    ):
+        self.audit_sink = audit_sink
+        self.on_created = on_created
+        self.batch_size = batch_size
+        self.imported = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.errors: List[LicenseImportError] = []
+        self._seen: Set[str] = set()
+
+    def _error(self, line: int, key: Optional[str], message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(LicenseImportError(line=line, key=key, error=message))
+
+    def _duplicate(self, line: int, key: str, message: str) -> None:
+        self.duplicates += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(LicenseImportError(line=line, key=key, error=message))
+
+    async def run(self, rows: AsyncIterator[ParsedRow]) -> LicenseImportResponse:
+        batch: List[Tuple[int, LicenseImport]] = []
+        async for line, record, error in rows:
+            if error is not None:
+                self._error(line, None, error)
+                continue
+            try:
+                data = LicenseImport(**record)
+            except ValidationError as exc:
+                fields = "; ".join(f"{'.'.join(map(str, item['loc']))}: {item['msg']}" for item in exc.errors())
+                self._error(line, record.get("key"), fields)
+                continue
+            if data.key in self._seen:
+                self._duplicate(line, data.key, "Duplicate key in upload")
+                continue
+            self._seen.add(data.key)
+            batch.append((line, data))
+            if len(batch) >= self.batch_size:
+                await self._flush(batch)
+                batch = []
+        if batch:
+            await self._flush(batch)
+        return LicenseImportResponse(
+            imported=self.imported,
+            duplicates=self.duplicates,
+            failed=self.failed,
+            errors=self.errors,
+            errors_truncated=self.failed + self.duplicates > len(self.errors),
+        )
+
+    async def _flush(self, batch: List[Tuple[int, LicenseImport]]) -> None:
+        async with get_async_session() as session:
+            existing = set(
+                await session.scalars(select(License.key).where(License.key.in_([data.key for _, data in batch])))
+            )
+            fresh = []
+            for line, data in batch:
+                if data.key in existing:
+                    self._duplicate(line, data.key, "License key already exists")
+                else:
+                    fresh.append((line, data))
+            if not fresh:
+                return
+            try:
+                await self._insert(session, fresh)
+                await self._record_created(session, fresh)
+                await session.commit()
+            except IntegrityError:
+                # Lost a race with a concurrent create: retry the chunk one row at a time.
+                await session.rollback()
+                for row in fresh:
+                    await self._insert_one(row)
+                return
+        self.imported += len(fresh)
+        for _, data in fresh:
+            await self.on_created(data.key)
+
+    async def _insert(self, session, rows: List[Tuple[int, LicenseImport]]) -> None:
+        now = datetime.utcnow()
+        await session.execute(
+            insert(License),
+            [{**data.dict(), "created_at": now, "updated_at": now} for _, data in rows],
+        )
+
+    async def _record_created(self, session, rows: List[Tuple[int, LicenseImport]]) -> None:
+        for _, data in rows:
+            await self.audit_sink.record(
+                session,
+                license_key=data.key,
+                action="create",
+                actor="admin",
+                message=f"License imported for {data.owner}",
+            )
+
+    async def _insert_one(self, row: Tuple[int, LicenseImport]) -> None:
+        line, data = row
+        async with get_async_session() as session:
+            try:
+                await self._insert(session, [row])
+                await self._record_created(session, [row])
+                await session.commit()
+            except IntegrityError:
+                await session.rollback()
+                self._duplicate(line, data.key, "License key already exists")
+                return
+        self.imported += 1
+        await self.on_created(data.key)
+
+
+def _export_value(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def export_record(license_obj: License) -> Dict[str, Any]:
+    return {column: _export_value(getattr(license_obj, column)) for column in EXPORT_COLUMNS}
+
+
+async def export_licenses(licenses: AsyncIterator[License], format: str) -> AsyncIterator[bytes]:
+    """Encode licenses as CSV or NDJSON; a row that fails to encode is reported and skipped."""
+    if format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(EXPORT_COLUMNS)
+        yield buffer.getvalue().encode()
+    async for license_obj in licenses:
+        try:
+            record = export_record(license_obj)
+            if format == "csv":
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerow(["" if value is None else value for value in record.values()])
+                line = buffer.getvalue().encode()
+            else:
+                line = ndjson_line(record)
+        except (TypeError, ValueError) as exc:
+            log.warning("Skipping license %s in export: %s", license_obj.id, exc)
+            if format == "ndjson":
+                yield json.dumps({"id": license_obj.id, "error": str(exc)}).encode() + b"\n"
+            continue
+        yield line
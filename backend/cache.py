@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from datetime import datetime
+from threading import Lock
+from typing import Dict, Optional, Set, Tuple
+
+from .models import LicenseValidationResponse
+
+CacheKey = Tuple[str, str]
+
+
+class ValidationCache:
+    """Bounded LRU/TTL cache of validation decisions keyed by (license key, guild id)."""
+
+    def __init__(self, max_entries: int = 10_000, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[CacheKey, Tuple[float, LicenseValidationResponse]]" = OrderedDict()
+        self._guilds_by_key: Dict[str, Set[str]] = {}
+        self._lock = Lock()
+
+    def get(self, key: str, guild_id: str) -> Optional[LicenseValidationResponse]:
+        cache_key = (key, guild_id)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is None:
+                self.misses += 1
+                return None
+            deadline, decision = entry
+            if deadline <= time.monotonic():
+                self._remove(cache_key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(cache_key)
+            self.hits += 1
+            return decision
+
+    def set(self, key: str, guild_id: str, decision: LicenseValidationResponse) -> None:
+        if self.max_entries <= 0:
+            return
+        ttl = self.ttl_seconds
+        if decision.valid and decision.expires_at is not None:
+            # Never serve a "valid" decision past the license's own expiry.
+            remaining = (decision.expires_at - datetime.utcnow()).total_seconds()
+            if remaining <= 0:
+                return
+            ttl = min(ttl, remaining)
+        cache_key = (key, guild_id)
+        with self._lock:
+            self._entries[cache_key] = (time.monotonic() + ttl, decision)
+            self._entries.move_to_end(cache_key)
+            self._guilds_by_key.setdefault(key, set()).add(guild_id)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            for guild_id in self._guilds_by_key.pop(key, set()):
+                self._entries.pop((key, guild_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._guilds_by_key.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _remove(self, cache_key: CacheKey) -> None:
+        self._entries.pop(cache_key, None)
+        key, guild_id = cache_key
+        guilds = self._guilds_by_key.get(key)
+        if guilds is not None:
+            guilds.discard(guild_id)
+            if not guilds:
+                del self._guilds_by_key[key]
@@ -1,23 +1,107 @@
 from __future__ import annotations
 
-from contextlib import contextmanager
-from datetime import datetime
-from typing import Generator, Optional
-
-from sqlalchemy import Column, DateTime, Integer, String, Boolean, create_engine
+import logging
+import time
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timedelta
+from typing import Any, AsyncGenerator, Dict, Generator, List, Optional
+
+from sqlalchemy import Column, Date, DateTime, Index, Integer, String, Boolean, UniqueConstraint, create_engine, event, or_, select, text, update
+from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
+from . import metrics
+from .migrations import run_migrations
 from .settings import get_settings
 
+log = logging.getLogger("backend.database")
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg", "mysql": "mysql+aiomysql"}
+
+
+def async_database_url(url: str) -> str:
+    parsed = make_url(url)
+    if parsed.drivername in ASYNC_DRIVERS:
+        parsed = parsed.set(drivername=ASYNC_DRIVERS[parsed.drivername])
+    return parsed.render_as_string(hide_password=False)
+
+
 settings = get_settings()
+
+
+def sqlite_pragmas(readonly: bool = False) -> Dict[str, Any]:
+    """Connection pragmas for the SQLite ``production`` storage profile."""
+    pragmas: Dict[str, Any] = {
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "cache_size": -settings.sqlite_cache_size_kib,
+        "mmap_size": settings.sqlite_mmap_size,
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+        "temp_store": "memory",
+        "foreign_keys": "on",
+    }
+    if readonly:
+        # Readers never change the journal mode and must not write by accident.
+        del pragmas["journal_mode"]
+        pragmas["query_only"] = "on"
+    return pragmas
+
+
+def _install_pragmas(target: Engine, pragmas: Dict[str, Any]) -> None:
+    @event.listens_for(target, "connect")
+    def _set_pragmas(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def _create_async_engine(url: str, pool_size: int, max_overflow: int) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        # A local SQLite file has no stale connections: skip the extra round trip per checkout.
+        pool_pre_ping=not is_sqlite,
+    )
+
+
+is_sqlite = make_url(settings.database_url).get_backend_name() == "sqlite"
+production_sqlite = is_sqlite and settings.sqlite_profile == "production"
 engine = create_engine(settings.database_url, connect_args={"check_same_thread": False})
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
+_async_url = settings.async_database_url or async_database_url(settings.database_url)
+if production_sqlite:
+    # SQLite allows a single writer at a time: funnel every write through one
+    # connection and serve reads from a separate WAL reader pool.
+    _install_pragmas(engine, sqlite_pragmas())
+    async_engine = _create_async_engine(_async_url, pool_size=1, max_overflow=0)
+    _install_pragmas(async_engine.sync_engine, sqlite_pragmas())
+    read_engine = _create_async_engine(_async_url, pool_size=settings.db_reader_pool_size, max_overflow=0)
+    _install_pragmas(read_engine.sync_engine, sqlite_pragmas(readonly=True))
+else:
+    async_engine = _create_async_engine(_async_url, pool_size=settings.db_pool_size, max_overflow=settings.db_max_overflow)
+    read_engine = async_engine
+if settings.metrics_enabled:
+    metrics.instrument_engine(async_engine.sync_engine, "writer")
+    if read_engine is not async_engine:
+        metrics.instrument_engine(read_engine.sync_engine, "reader")
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+ReadSessionLocal = async_sessionmaker(bind=read_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
 class License(Base):
     __tablename__ = "licenses"
+    __table_args__ = (Index("ix_licenses_expires_at", "expires_at"),)
 
     id = Column(Integer, primary_key=True, index=True)
     key = Column(String, unique=True, nullable=False, index=True)
@@ -34,16 +118,59 @@ class License(Base):
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        Index("ix_audit_logs_license_key_created_at", "license_key", "created_at"),
+        Index("ix_audit_logs_created_at", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    license_key = Column(String, index=True)
+    license_key = Column(String)
     action = Column(String, nullable=False)
     actor = Column(String, nullable=False)
     message = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
-Base.metadata.create_all(bind=engine)
+class AuditLogSummary(Base):
+    """Per-key daily action counts for audit rows removed by the retention job."""
+
+    __tablename__ = "audit_log_summaries"
+    __table_args__ = (UniqueConstraint("license_key", "day", "action", name="uq_audit_log_summaries_key_day_action"),)
+
+    id = Column(Integer, primary_key=True)
+    license_key = Column(String, nullable=False)
+    day = Column(Date, nullable=False)
+    action = Column(String, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class JobLease(Base):
+    """Lease row so that only one worker process runs a given background job."""
+
+    __tablename__ = "job_leases"
+
+    name = Column(String, primary_key=True)
+    holder = Column(String, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+
+def init_db(attempts: int = 5) -> List[str]:
+    """Create missing tables and apply pending migrations; returns the migrations applied.
+
+    Called once per process from the application lifespan. Several workers starting
+    together may race on the DDL or on ``schema_migrations``: the loser gets an error
+    from the database, waits for the winner and retries, finding the schema done.
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            Base.metadata.create_all(bind=engine)
+            return run_migrations(engine)
+        except (IntegrityError, OperationalError, ProgrammingError) as exc:
+            if attempt == attempts:
+                raise
+            log.info("Schema initialisation raced with another worker (%s), retrying", exc.__class__.__name__)
+            time.sleep(0.2 * attempt)
+    return []
 
 
 @contextmanager
@@ -55,5 +182,59 @@ def get_session() -> Generator[Session, None, None]:
         session.close()
 
 
+@asynccontextmanager
+async def get_async_session(readonly: bool = False) -> AsyncGenerator[AsyncSession, None]:
+    factory = ReadSessionLocal if readonly else AsyncSessionLocal
+    metrics.db_sessions.inc(("read",) if readonly else ("write",))
+    async with factory() as session:
+        yield session
+
+
+async def effective_pragmas() -> Dict[str, Dict[str, Any]]:
+    """Read back the pragmas actually in effect on the writer and reader connections."""
+    if not is_sqlite:
+        return {}
+    names = ("journal_mode", "synchronous", "cache_size", "mmap_size", "busy_timeout", "query_only")
+    report: Dict[str, Dict[str, Any]] = {}
+    for role, target in (("writer", async_engine), ("reader", read_engine)):
+        async with target.connect() as conn:
+            report[role] = {name: (await conn.execute(text(f"PRAGMA {name}"))).scalar() for name in names}
+    return report
+
+
+async def dispose_engines() -> None:
+    await async_engine.dispose()
+    if read_engine is not async_engine:
+        await read_engine.dispose()
+
+
+async def acquire_lease(name: str, holder: str, ttl_seconds: float) -> bool:
+    """Take or renew the ``name`` lease for ``holder``; False while another holder owns it."""
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=ttl_seconds)
+    async with get_async_session() as session:
+        result = await session.execute(
+            update(JobLease)
+            .where(JobLease.name == name, or_(JobLease.holder == holder, JobLease.expires_at < now))
+            .values(holder=holder, expires_at=expires_at)
+        )
+        if result.rowcount:
+            await session.commit()
+            return True
+        if await session.get(JobLease, name) is not None:
+            return False
+        session.add(JobLease(name=name, holder=holder, expires_at=expires_at))
+        try:
+            await session.commit()
+        except IntegrityError:
+            return False
+        return True
+
+
 def get_license(session: Session, license_key: str) -> Optional[License]:
     return session.query(License).filter(License.key == license_key).first()
+
+
+async def get_license_async(session: AsyncSession, license_key: str) -> Optional[License]:
+    result = await session.execute(select(License).where(License.key == license_key).limit(1))
+    return result.scalars().first()
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import select, update
+
+from .database import License, acquire_lease, get_async_session
+
+log = logging.getLogger("backend.expiry")
+
+LEASE_NAME = "expiry_sweeper"
+
+
+class ExpirySweeper:
+    """Deactivates expired licenses in bulk so validation never has to write.
+
+    Every ``interval`` seconds the sweeper walks ``ix_licenses_expires_at`` for active
+    licenses past their expiry, flips ``is_active`` ``batch_size`` rows at a time and
+    hands each key to ``on_expired`` (cache invalidation).
+    """
+
+    def __init__(
+        self,
+        on_expired: Callable[[str], Awaitable[None]],
+        interval: float = 60.0,
+        batch_size: int = 1_000,
+    ):
+        self.on_expired = on_expired
+        self.interval = interval
+        self.batch_size = batch_size
+        self.holder = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.expired = 0
+        self.last_run: Optional[datetime] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self, now: Optional[datetime] = None) -> int:
+        async with self._lock:
+            if not await acquire_lease(LEASE_NAME, self.holder, max(self.interval * 2, 60.0)):
+                return 0
+            now = now or datetime.utcnow()
+            swept = 0
+            while True:
+                async with get_async_session() as session:
+                    rows = (
+                        await session.execute(
+                            select(License.id, License.key)
+                            .where(License.expires_at < now, License.is_active.is_(True))
+                            .order_by(License.expires_at)
+                            .limit(self.batch_size)
+                        )
+                    ).all()
+                    if not rows:
+                        break
+                    await session.execute(
+                        update(License)
+                        .where(License.id.in_([row.id for row in rows]), License.is_active.is_(True))
+                        .values(is_active=False),
+                        execution_options={"synchronize_session": False},
+                    )
+                    await session.commit()
+                for row in rows:
+                    await self.on_expired(row.key)
+                swept += len(rows)
+                if len(rows) < self.batch_size:
+                    break
+            self.expired += swept
+            self.last_run = datetime.utcnow()
+            if swept:
+                log.info("Deactivated %d expired licenses", swept)
+            return swept
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "expired": self.expired,
+            "interval": self.interval,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                log.exception("Expiry sweep failed")
+            await asyncio.sleep(self.interval)
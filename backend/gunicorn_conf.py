@@ -0,0 +1,23 @@
+"""Gunicorn settings for running the license backend with several uvicorn workers.
+
+Usage: ``gunicorn -c backend/gunicorn_conf.py backend.app:app``. Each worker is a
+separate process with its own event loop, database pools and caches; rate limits,
+cache invalidations and token revocations are shared through ``ULB_SHARED_STATE_PATH``
+(``backend/shared_state.db`` by default).
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get("ULB_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("ULB_WORKERS") or multiprocessing.cpu_count())
+worker_class = "uvicorn.workers.UvicornWorker"
+# Apps must be imported after fork: engines, pools and SQLite handles are per process.
+preload_app = False
+# Leave time for the lifespan shutdown to drain each worker's audit buffer.
+graceful_timeout = 30
+timeout = 60
+keepalive = 5
+
+# Workers inherit the environment, so they all see the same worker count and agree on
+# enabling the shared state store even when ULB_WORKERS came from the CPU count.
+os.environ["ULB_WORKERS"] = str(workers)
@@ -0,0 +1,77 @@
+"""Binary antivirus hash database, written by the backend and read by the bot.
+
+Layout (little endian):
+  header  : magic, version, reserved, digest count, bloom bits, bloom hashes, padding
+  bloom   : bloom bits, padded to a multiple of DIGEST_SIZE bytes
+  digests : count * DIGEST_SIZE bytes, sorted
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import struct
+from pathlib import Path
+from typing import Iterable, Iterator
+
+MAGIC = b"UAVH"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQQII")
+DIGEST_SIZE = 32
+BLOOM_BITS_PER_ENTRY = 10
+BLOOM_HASHES = 7
+
+
+def padded(size: int) -> int:
+    return -(-size // DIGEST_SIZE) * DIGEST_SIZE
+
+
+def bloom_positions(digest: bytes, bits: int, hashes: int) -> Iterator[int]:
+    # SHA-256 output is already uniformly distributed: slice it instead of rehashing.
+    for i in range(hashes):
+        yield int.from_bytes(digest[4 * i : 4 * i + 4], "little") % bits
+
+
+def digests_offset(bloom_bits: int) -> int:
+    return HEADER.size + padded(-(-bloom_bits // 8))
+
+
+def parse_hex_digests(lines: Iterable[str]) -> Iterator[bytes]:
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            digest = bytes.fromhex(line)
+        except ValueError:
+            continue
+        if len(digest) == DIGEST_SIZE:
+            yield digest
+
+
+def write_hash_database(digests: Iterable[bytes], path: Path, presorted: bool = False) -> str:
+    """Write ``digests`` to ``path`` atomically and return the file's ETag.
+
+    With ``presorted`` the input must already be in order; duplicates are dropped in the
+    same single pass either way.
+    """
+    body = bytearray()
+    previous = None
+    for digest in digests if presorted else sorted(digests):
+        if digest != previous:
+            body += digest
+            previous = digest
+    count = len(body) // DIGEST_SIZE
+    bits = max(64, count * BLOOM_BITS_PER_ENTRY)
+    bloom = bytearray(padded(-(-bits // 8)))
+    view = memoryview(body)
+    for start in range(0, len(body), DIGEST_SIZE):
+        for position in bloom_positions(view[start : start + DIGEST_SIZE], bits, BLOOM_HASHES):
+            bloom[position >> 3] |= 1 << (position & 7)
+    checksum = hashlib.sha256()
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with tmp_path.open("wb") as fp:
+        for chunk in (HEADER.pack(MAGIC, VERSION, 0, count, bits, BLOOM_HASHES, 0), bloom, body):
+            fp.write(chunk)
+            checksum.update(chunk)
+    os.replace(tmp_path, path)
+    return checksum.hexdigest()[:32]
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+Labels = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        # Plain dict updates are atomic enough under the GIL for monotonic counters.
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Gauge:
+    """Value read from a callback at scrape time, so it costs nothing in between.
+
+    Also used with ``kind="counter"`` to export counters another component already keeps.
+    """
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], float], kind: str = "gauge"):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        self.kind = kind
+
+    def samples(self) -> Iterable[str]:
+        yield f"{self.name} {_format_value(self.callback())}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[Labels, List[float]] = {}
+        self._lock = Lock()
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(labels, [0] * (len(self.buckets) + 2))
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def samples(self) -> Iterable[str]:
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(series[-1])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[object] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, callback: Callable[[], float], kind: str = "gauge") -> Gauge:
+        return self.register(Gauge(name, documentation, callback, kind))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.counter("ulb_http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+http_latency = registry.histogram("ulb_http_request_duration_seconds", "HTTP request latency by route.", ("method", "route"))
+db_query_latency = registry.histogram("ulb_db_query_duration_seconds", "Database statement latency.", ("engine",))
+db_sessions = registry.counter("ulb_db_sessions_total", "Database sessions opened.", ("mode",))
+audit_rows_written = registry.counter("ulb_audit_rows_written_total", "Audit rows written to the database.")
+audit_rows_archived = registry.counter("ulb_audit_rows_archived_total", "Audit rows archived and removed by retention.")
+audit_flushes = registry.counter("ulb_audit_flushes_total", "Audit buffer flushes by outcome.", ("outcome",))
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: one clock read pair and two dict updates per request."""
+
+    def __init__(self, app, exclude: Sequence[str] = ()):
+        self.app = app
+        self.exclude = frozenset(exclude)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            # The router stores the matched route in the scope: label by its template
+            # (``/licenses/{license_key}``) to keep the label cardinality bounded.
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            http_requests.inc((method, path, str(status_code)))
+            http_latency.observe(elapsed, (method, path))
+
+
+def instrument_engine(sync_engine, label: str) -> None:
+    from sqlalchemy import event
+
+    labels = (label,)
+
+    # The start time rides on the per-statement execution context, which is cheaper than
+    # keeping a stack in ``conn.info``.
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._ulb_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_ulb_started", None)
+        if started is not None:
+            db_query_latency.observe(time.perf_counter() - started, labels)
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+# Ordered, append-only list of (name, statement). Statements must be idempotent so
+# that databases created by ``create_all`` with the latest schema can run them too.
+MIGRATIONS: List[Tuple[str, str]] = [
+    (
+        "0001_audit_logs_license_key_created_at",
+        "CREATE INDEX IF NOT EXISTS ix_audit_logs_license_key_created_at ON audit_logs (license_key, created_at)",
+    ),
+    (
+        "0002_audit_logs_created_at",
+        "CREATE INDEX IF NOT EXISTS ix_audit_logs_created_at ON audit_logs (created_at)",
+    ),
+    (
+        "0003_licenses_expires_at",
+        "CREATE INDEX IF NOT EXISTS ix_licenses_expires_at ON licenses (expires_at)",
+    ),
+    (
+        # Covered by ix_audit_logs_license_key_created_at, which leads with license_key.
+        "0004_drop_audit_logs_license_key",
+        "DROP INDEX IF EXISTS ix_audit_logs_license_key",
+    ),
+]
+
+
+def run_migrations(engine: Engine) -> List[str]:
+    applied: List[str] = []
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE IF NOT EXISTS schema_migrations (name VARCHAR PRIMARY KEY, applied_at DATETIME NOT NULL)"))
+        done = {row[0] for row in conn.execute(text("SELECT name FROM schema_migrations"))}
+        for name, statement in MIGRATIONS:
+            if name in done:
+                continue
+            conn.execute(text(statement))
+            conn.execute(
+                text("INSERT INTO schema_migrations (name, applied_at) VALUES (:name, :applied_at)"),
+                {"name": name, "applied_at": datetime.utcnow()},
+            )
+            applied.append(name)
+    return applied
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
+MAX_BATCH_VALIDATION_ITEMS = 500
+
 
 class LicenseCreate(BaseModel):
     owner: str
@@ -14,6 +16,28 @@ class LicenseCreate(BaseModel):
     notes: str = ""
 
 
+class LicenseImport(LicenseCreate):
+    """An imported row; also carries the state columns written by the export."""
+
+    guild_id: Optional[str]
+    is_active: bool = True
+    banned: bool = False
+
+
+class LicenseImportError(BaseModel):
+    line: int
+    key: Optional[str]
+    error: str
+
+
+class LicenseImportResponse(BaseModel):
+    imported: int
+    duplicates: int
+    failed: int
+    errors: List[LicenseImportError]
+    errors_truncated: bool = False
+
+
 class LicenseUpdate(BaseModel):
     owner: Optional[str]
     expires_at: Optional[datetime]
@@ -50,6 +74,14 @@ class LicenseValidationResponse(BaseModel):
     expires_at: Optional[datetime]
 
 
+class LicenseBatchValidationRequest(BaseModel):
+    items: List[LicenseValidationRequest] = Field(..., min_items=1, max_items=MAX_BATCH_VALIDATION_ITEMS)
+
+
+class LicenseBatchValidationResponse(BaseModel):
+    results: List[LicenseValidationResponse]
+
+
 class AuditLogResponse(BaseModel):
     action: str
     actor: str
@@ -58,3 +90,9 @@ class AuditLogResponse(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class AuditLogSummaryResponse(BaseModel):
+    day: date
+    action: str
+    count: int
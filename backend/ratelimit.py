@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import time
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Optional, Union
+
+# Each idle sweep inspects at most this many of the least recently used clients,
+# which keeps eviction amortised O(1) per request.
+EVICTION_BATCH = 4
+
+
+class MemoryBucketStore:
+    """Per-process GCRA state: one theoretical arrival time per client, LRU bounded."""
+
+    shared = False
+
+    def __init__(self, max_clients: int = 100_000):
+        self.max_clients = max_clients
+        self.evictions = 0
+        self._tats: "OrderedDict[str, float]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+    def update(self, client: str, interval: float, tolerance: float) -> float:
+        now = time.monotonic()
+        tat = max(self._tats.get(client, now), now)
+        retry_after = tat - now - tolerance
+        if retry_after > 0:
+            return retry_after
+        self._tats[client] = tat + interval
+        self._tats.move_to_end(client)
+        self._evict(now)
+        return 0.0
+
+    def _evict(self, now: float) -> None:
+        # A client whose TAT is in the past has a full bucket, which is exactly the
+        # state of an unknown client, so it can be dropped without changing behaviour.
+        for _ in range(EVICTION_BATCH):
+            oldest, tat = next(iter(self._tats.items()))
+            if tat > now:
+                break
+            del self._tats[oldest]
+            self.evictions += 1
+        while len(self._tats) > self.max_clients:
+            self._tats.popitem(last=False)
+            self.evictions += 1
+
+
+class SQLiteBucketStore:
+    """GCRA state in a SQLite file so that every worker process shares the same limits.
+
+    Like the memory store it is capped at ``max_clients``: each new client prunes a few
+    expired entries and, past the cap, the entries with the oldest TAT.
+    """
+
+    shared = True
+
+    def __init__(self, path: Union[str, Path], max_clients: int = 100_000):
+        self.path = Path(path)
+        self.max_clients = max_clients
+        self.evictions = 0
+        self._lock = Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS rate_limits (client TEXT PRIMARY KEY, tat REAL NOT NULL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_rate_limits_tat ON rate_limits (tat)")
+            # Row count kept by triggers, so the cap costs no COUNT(*) scan.
+            self._conn.execute("CREATE TABLE IF NOT EXISTS rate_limit_count (id INTEGER PRIMARY KEY CHECK (id = 1), n INTEGER NOT NULL)")
+            self._conn.execute("INSERT OR IGNORE INTO rate_limit_count (id, n) SELECT 1, COUNT(*) FROM rate_limits")
+            self._conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS rate_limits_count_insert AFTER INSERT ON rate_limits "
+                "BEGIN UPDATE rate_limit_count SET n = n + 1 WHERE id = 1; END"
+            )
+            self._conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS rate_limits_count_delete AFTER DELETE ON rate_limits "
+                "BEGIN UPDATE rate_limit_count SET n = n - 1 WHERE id = 1; END"
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT n FROM rate_limit_count").fetchone()[0]
+
+    def update(self, client: str, interval: float, tolerance: float) -> float:
+        with self._lock:
+            now = time.time()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT tat FROM rate_limits WHERE client = ?", (client,)).fetchone()
+                tat = max(row[0] if row else now, now)
+                retry_after = tat - now - tolerance
+                if retry_after <= 0:
+                    self._conn.execute(
+                        "INSERT INTO rate_limits (client, tat) VALUES (?, ?) "
+                        "ON CONFLICT(client) DO UPDATE SET tat = excluded.tat",
+                        (client, tat + interval),
+                    )
+                    if row is None:
+                        self._evict(now)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return max(retry_after, 0.0)
+
+    def _evict(self, now: float) -> None:
+        deleted = self._conn.execute(
+            "DELETE FROM rate_limits WHERE client IN (SELECT client FROM rate_limits WHERE tat <= ? ORDER BY tat LIMIT ?)",
+            (now, EVICTION_BATCH),
+        ).rowcount
+        overflow = self._conn.execute("SELECT n FROM rate_limit_count").fetchone()[0] - self.max_clients
+        if overflow > 0:
+            deleted += self._conn.execute(
+                "DELETE FROM rate_limits WHERE client IN (SELECT client FROM rate_limits ORDER BY tat LIMIT ?)",
+                (overflow,),
+            ).rowcount
+        self.evictions += deleted
+
+
+class RateLimiter:
+    """GCRA rate limiter: ``rate_per_minute`` sustained, bursts of up to ``burst`` requests."""
+
+    def __init__(self, rate_per_minute: int, burst: Optional[int] = None, store: Optional[Union[MemoryBucketStore, SQLiteBucketStore]] = None):
+        self.interval = 60.0 / max(rate_per_minute, 1)
+        self.tolerance = self.interval * max((burst or rate_per_minute) - 1, 0)
+        self.store = store if store is not None else MemoryBucketStore()
+        self.rejections = 0
+
+    async def hit(self, client: str) -> float:
+        """Consume one request for ``client``; return 0 if allowed, else seconds until retry."""
+        if self.store.shared:
+            retry_after = await asyncio.to_thread(self.store.update, client, self.interval, self.tolerance)
+        else:
+            retry_after = self.store.update(client, self.interval, self.tolerance)
+        if retry_after > 0:
+            self.rejections += 1
+        return retry_after
+
+    def stats(self) -> dict:
+        return {
+            "clients": len(self.store),
+            "max_clients": self.store.max_clients,
+            "evictions": self.store.evictions,
+            "rejections": self.rejections,
+            "shared": self.store.shared,
+        }
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import importlib
+import json
+import logging
+import os
+import uuid
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import metrics
+from .database import AuditLog, AuditLogSummary, acquire_lease, get_async_session
+
+log = logging.getLogger("backend.retention")
+
+LEASE_NAME = "audit_retention"
+
+SummaryKey = Tuple[str, date, str]
+
+
+def _serialize(row: AuditLog) -> bytes:
+    return json.dumps(
+        {
+            "id": row.id,
+            "license_key": row.license_key,
+            "action": row.action,
+            "actor": row.actor,
+            "message": row.message,
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+        },
+        separators=(",", ":"),
+    ).encode() + b"\n"
+
+
+async def _add_summaries(session: AsyncSession, counts: Dict[SummaryKey, int]) -> None:
+    values = [{"license_key": key, "day": day, "action": action, "count": count} for (key, day, action), count in counts.items()]
+    dialect = session.bind.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        # Imported on use: loading the PostgreSQL dialect costs ~20 ms at startup.
+        dialect_module = importlib.import_module(f"sqlalchemy.dialects.{dialect}")
+        insert = dialect_module.insert(AuditLogSummary)
+        await session.execute(
+            insert.on_conflict_do_update(
+                index_elements=["license_key", "day", "action"],
+                set_={"count": AuditLogSummary.count + insert.excluded.count},
+            ),
+            values,
+        )
+        return
+    for value in values:
+        existing = await session.scalar(
+            select(AuditLogSummary).where(
+                AuditLogSummary.license_key == value["license_key"],
+                AuditLogSummary.day == value["day"],
+                AuditLogSummary.action == value["action"],
+            )
+        )
+        if existing is None:
+            session.add(AuditLogSummary(**value))
+        else:
+            existing.count += value["count"]
+
+
+class AuditRetention:
+    """Scheduled roll-up of audit rows older than ``retention_days``.
+
+    Each batch is appended to a gzip NDJSON segment in ``archive_dir`` and fsynced, then
+    folded into ``audit_log_summaries`` and deleted in one short transaction. Between
+    batches the job sleeps ``pause`` seconds so request writes are never starved. A lease
+    in ``job_leases`` keeps a single worker process in charge. Export is at-least-once: a
+    batch whose transaction fails is written again to the archive on the next run.
+    """
+
+    def __init__(
+        self,
+        retention_days: int,
+        archive_dir: Path,
+        interval: float = 3600.0,
+        batch_size: int = 5_000,
+        pause: float = 0.05,
+        segment_rows: int = 100_000,
+    ):
+        self.retention_days = retention_days
+        self.archive_dir = Path(archive_dir)
+        self.interval = interval
+        self.batch_size = batch_size
+        self.pause = pause
+        self.segment_rows = segment_rows
+        self.holder = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.archived = 0
+        self.last_run: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self._segment: Optional[Path] = None
+        self._segment_count = 0
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.retention_days > 0
+
+    def cutoff(self, now: Optional[datetime] = None) -> datetime:
+        # Whole days only, so a day is summarized once and never split across runs.
+        now = now or datetime.utcnow()
+        return datetime.combine(now.date() - timedelta(days=self.retention_days), time())
+
+    async def run_once(self, now: Optional[datetime] = None) -> int:
+        """Archive, summarize and delete every expired row; returns the number of rows removed."""
+        if not self.enabled:
+            return 0
+        async with self._lock:
+            return await self._run_once(now)
+
+    async def _run_once(self, now: Optional[datetime]) -> int:
+        lease_ttl = max(self.interval, 60.0)
+        if not await acquire_lease(LEASE_NAME, self.holder, lease_ttl):
+            return 0
+        cutoff = self.cutoff(now)
+        removed = 0
+        while True:
+            async with get_async_session(readonly=True) as session:
+                result = await session.scalars(
+                    select(AuditLog)
+                    .where(AuditLog.created_at < cutoff)
+                    .order_by(AuditLog.created_at, AuditLog.id)
+                    .limit(self.batch_size)
+                )
+                rows = result.all()
+            if not rows:
+                break
+            await asyncio.to_thread(self._append_segment, rows, cutoff)
+            await self._compact(rows, cutoff)
+            removed += len(rows)
+            self.archived += len(rows)
+            metrics.audit_rows_archived.inc(amount=len(rows))
+            if len(rows) < self.batch_size:
+                break
+            await asyncio.sleep(self.pause)
+            if not await acquire_lease(LEASE_NAME, self.holder, lease_ttl):
+                break
+        self._segment = None
+        self.last_run = datetime.utcnow()
+        if removed:
+            log.info("Archived %d audit rows older than %s", removed, cutoff.date())
+        return removed
+
+    async def _compact(self, rows: List[AuditLog], cutoff: datetime) -> None:
+        counts: Dict[SummaryKey, int] = Counter((row.license_key, row.created_at.date(), row.action) for row in rows)
+        last = rows[-1]
+        async with get_async_session() as session:
+            result = await session.execute(
+                delete(AuditLog)
+                .where(AuditLog.created_at < cutoff)
+                .where(tuple_(AuditLog.created_at, AuditLog.id) <= (last.created_at, last.id))
+            )
+            if result.rowcount != len(rows):
+                await session.rollback()
+                raise RuntimeError(f"Expected to delete {len(rows)} audit rows, matched {result.rowcount}")
+            await _add_summaries(session, counts)
+            await session.commit()
+
+    def _append_segment(self, rows: List[AuditLog], cutoff: datetime) -> None:
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        if self._segment is None or self._segment_count >= self.segment_rows:
+            stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+            self._segment = self.archive_dir / f"audit-{cutoff:%Y%m%d}-{stamp}.ndjson.gz"
+            self._segment_count = 0
+        # Each batch is its own gzip member: the file stays readable with gzip.open even
+        # if the process dies between two batches.
+        with self._segment.open("ab") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb") as fp:
+                for row in rows:
+                    fp.write(_serialize(row))
+            raw.flush()
+            os.fsync(raw.fileno())
+        self._segment_count += len(rows)
+
+    async def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "retention_days": self.retention_days,
+            "archive_dir": str(self.archive_dir),
+            "archived": self.archived,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "last_error": self.last_error,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+                self.last_error = None
+            except Exception as exc:
+                self.last_error = str(exc)
+                log.exception("Audit retention run failed")
+            await asyncio.sleep(self.interval)
@@ -3,10 +3,14 @@ from __future__ import annotations
 import base64
 import hashlib
 import hmac
+import time
+import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Tuple
+from threading import Lock
+from typing import Dict, Tuple
 
-from jose import jwt
+from jose import JWTError, jwt
 
 from .settings import get_settings
 
@@ -26,7 +30,7 @@ def verify_signature(value: str, signature: str) -> bool:
 
 def create_access_token(subject: str, expires_delta: int | None = None) -> Tuple[str, datetime]:
     expires = datetime.utcnow() + timedelta(minutes=expires_delta or settings.token_expiration_minutes)
-    payload = {"sub": subject, "exp": expires}
+    payload = {"sub": subject, "exp": expires, "jti": uuid.uuid4().hex}
     token = jwt.encode(payload, settings.secret_key, algorithm=ALGORITHM)
     return token, expires
 
@@ -35,6 +39,84 @@ def decode_access_token(token: str) -> dict:
     return jwt.decode(token, settings.secret_key, algorithms=[ALGORITHM])
 
 
+class TokenCache:
+    """Verified-token cache with a revocation list.
+
+    Tokens are keyed by their SHA-256 digest so the raw bearer value is never kept. A
+    cached payload is served until the token's ``exp`` claim; revoked digests are kept
+    until the token would have expired anyway.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._revoked: Dict[str, float] = {}
+        self._lock = Lock()
+
+    def verify(self, token: str) -> dict:
+        digest = _token_digest(token)
+        now = time.time()
+        with self._lock:
+            if digest in self._revoked:
+                raise JWTError("Token has been revoked")
+            entry = self._entries.get(digest)
+            if entry is not None:
+                expires, payload = entry
+                if expires > now:
+                    self._entries.move_to_end(digest)
+                    self.hits += 1
+                    return payload
+                del self._entries[digest]
+            self.misses += 1
+        payload = decode_access_token(token)
+        with self._lock:
+            self._entries[digest] = (float(payload.get("exp", now)), payload)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return payload
+
+    def revoke(self, token: str) -> Tuple[str, float]:
+        """Revoke ``token`` and return its digest and how long the revocation must be kept."""
+        digest = _token_digest(token)
+        try:
+            expires = float(jwt.get_unverified_claims(token).get("exp", 0))
+        except JWTError:
+            expires = 0.0
+        until = max(expires, time.time() + settings.token_expiration_minutes * 60)
+        self.revoke_digest(digest, until)
+        return digest, until
+
+    def revoke_digest(self, digest: str, until: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._entries.pop(digest, None)
+            self._revoked[digest] = until
+            for revoked_digest, revoked_until in list(self._revoked.items()):
+                if revoked_until <= now:
+                    del self._revoked[revoked_digest]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "revoked": len(self._revoked), "hits": self.hits, "misses": self.misses}
+
+
+def _token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+token_cache = TokenCache()
+
+
+def verify_access_token(token: str) -> dict:
+    return token_cache.verify(token)
+
+
+def revoke_access_token(token: str) -> Tuple[str, float]:
+    return token_cache.revoke(token)
+
+
 def machine_fingerprint(user_agent: str, hardware_id: str) -> str:
     raw = f"{user_agent}:{hardware_id}:{settings.secret_key}"
     return hashlib.sha256(raw.encode()).hexdigest()
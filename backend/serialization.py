@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from sqlalchemy import Column
+
+from .database import AuditLog, License
+from .models import AuditLogResponse, LicenseResponse
+
+# Fast path for endpoints returning ORM rows: select exactly the columns of the response
+# model and hand the raw values to orjson, skipping ORM entity and Pydantic model
+# construction per row. This is only safe because every field below is a plain column
+# whose Python type (str, int, bool, datetime, None) already matches the response model,
+# so there is nothing for Pydantic to coerce. The routes keep their ``response_model``,
+# which still drives the OpenAPI schema.
+LICENSE_FIELDS: Sequence[str] = tuple(LicenseResponse.__fields__)
+AUDIT_LOG_FIELDS: Sequence[str] = tuple(AuditLogResponse.__fields__)
+
+LICENSE_COLUMNS: Sequence[Column] = tuple(License.__table__.c[name] for name in LICENSE_FIELDS)
+AUDIT_LOG_COLUMNS: Sequence[Column] = tuple(AuditLog.__table__.c[name] for name in AUDIT_LOG_FIELDS)
+
+
+def row_payload(fields: Sequence[str], values: Iterable[Any]) -> Dict[str, Any]:
+    return dict(zip(fields, values))
+
+
+def license_payload(license_obj: License) -> Dict[str, Any]:
+    return {name: getattr(license_obj, name) for name in LICENSE_FIELDS}
+
+
+def json_response(content: Any, headers: Optional[Mapping[str, str]] = None) -> ORJSONResponse:
+    if isinstance(content, BaseModel):
+        content = content.dict()
+    return ORJSONResponse(content, headers=dict(headers) if headers else None)
+
+
+def ndjson_line(payload: Any) -> bytes:
+    return orjson.dumps(payload, option=orjson.OPT_APPEND_NEWLINE)
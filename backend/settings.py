@@ -1,19 +1,61 @@
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
+
 from pydantic import BaseSettings, Field
 
 
 class Settings(BaseSettings):
     app_name: str = "Ultimate License Backend"
+    log_level: str = Field(default="INFO")
     database_url: str = Field(default=f"sqlite:///{(Path(__file__).resolve().parent / 'licenses.db').as_posix()}")
+    async_database_url: Optional[str] = Field(default=None)
+    db_pool_size: int = Field(default=10)
+    db_max_overflow: int = Field(default=20)
+    db_pool_timeout: float = Field(default=30.0)
+    db_pool_recycle: int = Field(default=1800)
+    db_reader_pool_size: int = Field(default=8)
+    sqlite_profile: str = Field(default="default")
+    sqlite_journal_mode: str = Field(default="wal")
+    sqlite_synchronous: str = Field(default="normal")
+    sqlite_cache_size_kib: int = Field(default=65_536)
+    sqlite_mmap_size: int = Field(default=268_435_456)
+    sqlite_busy_timeout_ms: int = Field(default=5_000)
     secret_key: str = Field(default="change-me-super-secret-key")
     token_expiration_minutes: int = Field(default=60)
     rate_limit_per_minute: int = Field(default=60)
+    rate_limit_burst: Optional[int] = Field(default=None)
+    rate_limit_max_clients: int = Field(default=100_000)
+    rate_limit_shared_path: Optional[Path] = Field(default=None)
+    validation_cache_size: int = Field(default=10_000)
+    validation_cache_ttl_seconds: float = Field(default=300.0)
+    last_seen_flush_interval_seconds: float = Field(default=30.0)
+    expiry_sweep_interval_seconds: float = Field(default=60.0)
+    expiry_sweep_batch_size: int = Field(default=1_000)
+    audit_mode: str = Field(default="buffered")
+    audit_batch_size: int = Field(default=500)
+    audit_flush_interval_seconds: float = Field(default=1.0)
+    audit_max_buffer: int = Field(default=50_000)
+    audit_retention_days: int = Field(default=0)
+    audit_retention_interval_seconds: float = Field(default=3600.0)
+    audit_retention_batch_size: int = Field(default=5_000)
+    audit_retention_pause_seconds: float = Field(default=0.05)
+    audit_archive_dir: Path = Field(default=Path(__file__).resolve().parent / "audit_archive")
+    audit_archive_segment_rows: int = Field(default=100_000)
+    workers: int = Field(default=1)
+    shared_state_path: Optional[Path] = Field(default=None)
+    shared_state_poll_interval: float = Field(default=0.5)
     antivirus_hash_db: Path = Field(default=Path(__file__).resolve().parent / "antivirus_hashes.txt")
+    antivirus_history_size: int = Field(default=10)
+    metrics_enabled: bool = Field(default=True)
+    metrics_token: Optional[str] = Field(default=None)
 
     class Config:
         env_prefix = "ULB_"
         env_file = ".env"
 
 
+@lru_cache(maxsize=None)
 def get_settings() -> Settings:
+    """Process-wide settings, read from the environment and ``.env`` once."""
     return Settings()
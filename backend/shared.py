@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Callable, List, Optional, Tuple, Union
+
+log = logging.getLogger("backend.shared")
+
+Event = Tuple[int, str, str, float]
+
+# Invalidation events only need to outlive the slowest poller.
+EVENT_RETENTION_SECONDS = 3600
+
+
+class SharedState:
+    """Cross-worker event log in a SQLite file.
+
+    Every worker appends cache invalidations and token revocations to the same file and
+    polls it for events published by the others, so a ban or a revoked token reaches
+    every process within ``poll_interval`` seconds.
+    """
+
+    def __init__(self, path: Union[str, Path], poll_interval: float = 0.5):
+        self.path = Path(path)
+        self.poll_interval = poll_interval
+        self._lock = Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS shared_events ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, value TEXT NOT NULL, "
+            "expires REAL NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._last_seq = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM shared_events").fetchone()[0]
+
+    async def publish_invalidation(self, license_key: str) -> None:
+        await asyncio.to_thread(self._publish, "invalidate", license_key, time.time() + EVENT_RETENTION_SECONDS)
+
+    async def publish_revocation(self, token_digest: str, until: float) -> None:
+        await asyncio.to_thread(self._publish, "revoke", token_digest, until)
+
+    def active_revocations(self) -> List[Tuple[str, float]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT value, expires FROM shared_events WHERE kind = 'revoke' AND expires > ?", (time.time(),)
+            )
+            return [(value, expires) for value, expires in rows]
+
+    async def start(self, on_invalidate: Callable[[str], None], on_revoke: Callable[[str, float], None]) -> None:
+        for digest, until in await asyncio.to_thread(self.active_revocations):
+            on_revoke(digest, until)
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(on_invalidate, on_revoke))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        with self._lock:
+            self._conn.close()
+
+    def _publish(self, kind: str, value: str, expires: float) -> None:
+        with self._lock:
+            now = time.time()
+            self._conn.execute(
+                "INSERT INTO shared_events (kind, value, expires, created_at) VALUES (?, ?, ?, ?)",
+                (kind, value, expires, now),
+            )
+
+    def _fetch(self) -> List[Event]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, kind, value, expires FROM shared_events WHERE seq > ? ORDER BY seq", (self._last_seq,)
+            ).fetchall()
+            if rows:
+                self._last_seq = rows[-1][0]
+            return rows
+
+    def _cleanup(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM shared_events WHERE expires <= ?", (time.time(),))
+
+    async def _run(self, on_invalidate: Callable[[str], None], on_revoke: Callable[[str, float], None]) -> None:
+        polls = 0
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                for _, kind, value, expires in await asyncio.to_thread(self._fetch):
+                    if kind == "invalidate":
+                        on_invalidate(value)
+                    elif kind == "revoke":
+                        on_revoke(value, expires)
+                polls += 1
+                if polls % 1000 == 0:
+                    await asyncio.to_thread(self._cleanup)
+            except sqlite3.Error:
+                log.exception("Failed to poll shared state at %s", self.path)
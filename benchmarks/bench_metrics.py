@@ -0,0 +1,167 @@
+"""Measure the cost of the metrics instrumentation.
+
+Reports the per-request overhead of ``MetricsMiddleware`` around a no-op ASGI app, the
+per-statement overhead of the SQLAlchemy timing listeners, and the end-to-end latency of
+the validate hot path (cache hit) with ``ULB_METRICS_ENABLED`` on and off.
+
+Run from the repository root: ``python -m benchmarks.bench_metrics``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+
+from backend import metrics
+
+ROUNDS = 5
+
+
+async def _noop_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message):
+    pass
+
+
+def _scope(method: str, path: str, query: bytes = b"", headers=()) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query,
+        "headers": list(headers),
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+
+def bench_middleware(iterations: int) -> tuple[float, float]:
+    wrapped = metrics.MetricsMiddleware(_noop_app)
+    scope = _scope("POST", "/licenses/validate")
+
+    async def run(target) -> float:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            await target(dict(scope), _receive, _send)
+        return (time.perf_counter() - started) / iterations
+
+    return asyncio.run(run(_noop_app)), asyncio.run(run(wrapped))
+
+
+def bench_listeners(iterations: int) -> tuple[float, float]:
+    bare = create_engine("sqlite://")
+    instrumented = create_engine("sqlite://")
+    metrics.instrument_engine(instrumented, "bench")
+    results = []
+    for engine in (bare, instrumented):
+        with engine.connect() as conn:
+            statement = text("SELECT 1")
+            results.append(timeit.timeit(lambda: conn.execute(statement), number=iterations) / iterations)
+    return results[0], results[1]
+
+
+async def _call(app, method: str, path: str, body: bytes = b"", query: bytes = b"", token: str = "") -> tuple[int, bytes]:
+    headers = [(b"content-type", b"application/json")]
+    if token:
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    response = {"status": 0, "body": b""}
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    await app(_scope(method, path, query, headers), receive, send)
+    return response["status"], response["body"]
+
+
+async def _validate_child(iterations: int) -> float:
+    from backend.app import app
+
+    async with app.router.lifespan_context(app):
+        password = os.environ.get("ULB_SECRET_KEY", "change-me-super-secret-key")
+        _, body = await _call(app, "POST", "/auth/token", query=f"password={password}".encode())
+        token = json.loads(body)["token"]
+        await _call(app, "POST", "/licenses", json.dumps({"owner": "bench", "key": "BENCH-METRICS-0001"}).encode(), token=token)
+        payload = json.dumps({"key": "BENCH-METRICS-0001", "guild_id": "guild-1", "machine_fingerprint": "bench"}).encode()
+        for _ in range(200):
+            await _call(app, "POST", "/licenses/validate", payload)
+        # Best of several rounds: the minimum is far less sensitive to scheduler noise.
+        rounds = []
+        for _ in range(ROUNDS):
+            started = time.perf_counter()
+            for _ in range(iterations):
+                await _call(app, "POST", "/licenses/validate", payload)
+            rounds.append((time.perf_counter() - started) / iterations)
+        return min(rounds)
+
+
+def bench_validate(iterations: int, enabled: bool) -> float:
+    with tempfile.TemporaryDirectory(prefix="ulb-bench-") as workdir:
+        env = dict(
+            os.environ,
+            ULB_METRICS_ENABLED="1" if enabled else "0",
+            ULB_DATABASE_URL=f"sqlite:///{(Path(workdir) / 'bench.db').as_posix()}",
+            ULB_ANTIVIRUS_HASH_DB=str(Path(workdir) / "antivirus_hashes.txt"),
+            ULB_RATE_LIMIT_PER_MINUTE=str(10**9),
+        )
+        output = subprocess.check_output(
+            [sys.executable, "-m", "benchmarks.bench_metrics", "--validate-child", "--iterations", str(iterations)],
+            env=env,
+            text=True,
+        )
+    return float(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument("--validate-child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.validate_child:
+        print(asyncio.run(_validate_child(args.iterations)))
+        return
+
+    bare, wrapped = bench_middleware(args.iterations)
+    print(f"no-op ASGI app        : {bare * 1e6:8.2f} us/request")
+    print(f"  + MetricsMiddleware : {wrapped * 1e6:8.2f} us/request ({(wrapped - bare) * 1e6:+.2f} us)")
+
+    plain, timed = bench_listeners(args.iterations)
+    print(f"SELECT 1              : {plain * 1e6:8.2f} us/statement")
+    print(f"  + timing listeners  : {timed * 1e6:8.2f} us/statement ({(timed - plain) * 1e6:+.2f} us)")
+
+    validate_iterations = max(1, args.iterations // (10 * ROUNDS))
+    off = bench_validate(validate_iterations, enabled=False)
+    on = bench_validate(validate_iterations, enabled=True)
+    print(f"validate, metrics off : {off * 1e6:8.2f} us/request")
+    print(f"validate, metrics on  : {on * 1e6:8.2f} us/request ({(on - off) / off * 100:+.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Compare the ORM + Pydantic response path with the column-row + orjson fast path.
+
+The "orm_mode" path loads License entities and serializes them the way FastAPI does for a
+``response_model`` (validate, ``jsonable_encoder``, ``json.dumps``). The fast path selects
+the response columns and encodes plain dicts with orjson, as ``GET /licenses`` now does.
+Both read from the same in-memory SQLite table.
+
+Run from the repository root: ``python -m benchmarks.bench_serialization``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from backend.database import Base, License
+from backend.models import LicenseResponse
+from backend.serialization import LICENSE_COLUMNS, LICENSE_FIELDS, json_response, ndjson_line, row_payload
+
+ROUNDS = 5
+
+
+def seed(rows: int) -> Session:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(
+            insert(License),
+            [
+                {
+                    "key": f"BENCHKEY-{index:010d}",
+                    "owner": f"owner-{index % 50}",
+                    "expires_at": now + timedelta(days=index % 365) if index % 3 else None,
+                    "max_guilds": 1 + index % 4,
+                    "guild_id": str(100000000000000000 + index) if index % 2 else None,
+                    "notes": "bench",
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for index in range(rows)
+            ],
+        )
+    return Session(engine)
+
+
+def best_of(func: Callable[[], object], iterations: int) -> float:
+    timings = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        timings.append((time.perf_counter() - started) / iterations)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000, help="Rows per response (the list page size)")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    session = seed(args.rows)
+    field = create_response_field(name="bench", type_=List[LicenseResponse])
+    loop = asyncio.new_event_loop()
+    entity_query = select(License).order_by(License.id)
+    column_query = entity_query.with_only_columns(*LICENSE_COLUMNS)
+
+    def orm_mode_list() -> bytes:
+        licenses = session.scalars(entity_query).all()
+        content = loop.run_until_complete(serialize_response(field=field, response_content=licenses))
+        body = JSONResponse(content).body
+        session.expunge_all()
+        return body
+
+    def fast_list() -> bytes:
+        rows = session.execute(column_query).all()
+        return json_response([row_payload(LICENSE_FIELDS, row) for row in rows]).body
+
+    def orm_mode_ndjson() -> bytes:
+        body = b"".join(LicenseResponse.from_orm(obj).json().encode() + b"\n" for obj in session.scalars(entity_query))
+        session.expunge_all()
+        return body
+
+    def fast_ndjson() -> bytes:
+        return b"".join(ndjson_line(row_payload(LICENSE_FIELDS, row)) for row in session.execute(column_query))
+
+    assert orm_mode_list().replace(b" ", b"") == fast_list().replace(b" ", b""), "payloads differ"
+
+    print(f"rows per response : {args.rows}")
+    for label, slow, fast in (("JSON list", orm_mode_list, fast_list), ("NDJSON stream", orm_mode_ndjson, fast_ndjson)):
+        slow_time = best_of(slow, args.iterations)
+        fast_time = best_of(fast, args.iterations)
+        print(f"{label:<14} orm_mode: {slow_time * 1e3:8.2f} ms   fast path: {fast_time * 1e3:8.2f} ms   speedup: {slow_time / fast_time:5.1f}x")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
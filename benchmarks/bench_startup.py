@@ -0,0 +1,101 @@
+"""Import-time profile of the backend.
+
+Runs ``python -X importtime -c "import backend.app"`` in a fresh interpreter (what every
+worker fork pays), then reports the total, the slowest modules and the project's own
+modules, followed by the cost of the explicit startup steps: settings and ``init_db``.
+
+Run from the repository root: ``python -m benchmarks.bench_startup``.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ImportTimes = Dict[str, Tuple[int, int]]
+
+
+def profile_imports(module: str, env: Dict[str, str]) -> ImportTimes:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: ImportTimes = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:") :].split("|"))
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def wall_time(module: str, env: Dict[str, str], runs: int) -> float:
+    timings: List[float] = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", f"import {module}"], env=env, check=True)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="backend.app")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--runs", type=int, default=5, help="Interpreter launches for the wall-clock median")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="ulb-startup-") as workdir:
+        env = dict(
+            os.environ,
+            ULB_DATABASE_URL=f"sqlite:///{(Path(workdir) / 'startup.db').as_posix()}",
+            ULB_ANTIVIRUS_HASH_DB=str(Path(workdir) / "antivirus_hashes.txt"),
+        )
+        times = profile_imports(args.module, env)
+        total = times.get(args.module, (0, 0))[1]
+        print(f"import {args.module}: {total / 1000:.1f} ms cumulative (-X importtime)")
+        print(f"interpreter + import, median of {args.runs}: {wall_time(args.module, env, args.runs) * 1000:.1f} ms")
+        print(f"database file created by the import: {(Path(workdir) / 'startup.db').exists()}")
+
+        print("\nslowest modules (self time):")
+        for name, (self_us, cumulative_us) in sorted(times.items(), key=lambda item: item[1][0], reverse=True)[: args.top]:
+            print(f"  {self_us / 1000:8.1f} ms  {cumulative_us / 1000:8.1f} ms cumulative  {name}")
+
+        print("\nproject modules (cumulative):")
+        for name, (self_us, cumulative_us) in sorted(times.items(), key=lambda item: item[1][1], reverse=True):
+            if name.startswith("backend"):
+                print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+        os.environ.update(env)
+        from backend.settings import get_settings
+
+        started = time.perf_counter()
+        get_settings()
+        first = time.perf_counter() - started
+        started = time.perf_counter()
+        for _ in range(1000):
+            get_settings()
+        cached = (time.perf_counter() - started) / 1000
+        print(f"\nget_settings(): first call {first * 1e3:.2f} ms, cached {cached * 1e6:.2f} us")
+
+        from backend.database import init_db
+
+        started = time.perf_counter()
+        init_db()
+        print(f"init_db() on an empty database: {(time.perf_counter() - started) * 1000:.1f} ms")
+        started = time.perf_counter()
+        init_db()
+        print(f"init_db() on an up-to-date database: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
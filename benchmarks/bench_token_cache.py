@@ -0,0 +1,32 @@
+"""Compare admin token verification with and without the verified-token cache.
+
+Run from the repository root: ``python -m benchmarks.bench_token_cache``.
+"""
+from __future__ import annotations
+
+import argparse
+import timeit
+
+from backend.security import TokenCache, create_access_token, decode_access_token
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+
+    token, _ = create_access_token("admin")
+    cache = TokenCache()
+    cache.verify(token)
+
+    uncached = timeit.timeit(lambda: decode_access_token(token), number=args.iterations)
+    cached = timeit.timeit(lambda: cache.verify(token), number=args.iterations)
+
+    print(f"iterations         : {args.iterations}")
+    print(f"decode_access_token: {uncached / args.iterations * 1e6:8.2f} us/call")
+    print(f"TokenCache.verify  : {cached / args.iterations * 1e6:8.2f} us/call")
+    print(f"speedup            : {uncached / cached:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
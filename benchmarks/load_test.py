@@ -0,0 +1,209 @@
+"""Load test for the license backend.
+
+Drives the main endpoints at a configurable concurrency against a throw-away SQLite
+database and reports throughput and latency percentiles per scenario.
+
+Run from the repository root::
+
+    python -m benchmarks.load_test --concurrency 32 --requests 2000 --output results.json
+
+By default the app runs in-process through an ASGI transport; pass ``--url`` to target a
+running server instead (seeding then goes through that server's API).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import AsyncExitStack
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+
+SCENARIOS = ("validate", "validate_batch", "list", "get", "create", "update", "delete")
+KEY_PREFIX = "LOADTEST-"
+
+Scenario = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def license_key(index: int) -> str:
+    return f"{KEY_PREFIX}{index:010d}"
+
+
+def build_scenarios(headers: Dict[str, str], seeded: int, run_id: str) -> Dict[str, Scenario]:
+    def validate(client: httpx.AsyncClient, i: int):
+        payload = {"key": license_key(i % seeded), "guild_id": f"guild-{i % seeded}", "machine_fingerprint": "bench"}
+        return client.post("/licenses/validate", json=payload)
+
+    def validate_batch(client: httpx.AsyncClient, i: int):
+        items = [
+            {"key": license_key(j % seeded), "guild_id": f"guild-{j % seeded}", "machine_fingerprint": "bench"}
+            for j in range(i * 50, i * 50 + 50)
+        ]
+        return client.post("/licenses/validate/batch", json={"items": items})
+
+    def list_page(client: httpx.AsyncClient, i: int):
+        return client.get("/licenses", params={"limit": 100, "cursor": (i * 100) % max(seeded, 1)}, headers=headers)
+
+    def get(client: httpx.AsyncClient, i: int):
+        return client.get(f"/licenses/{license_key(i % seeded)}", headers=headers)
+
+    def create(client: httpx.AsyncClient, i: int):
+        payload = {"owner": "bench", "key": f"{KEY_PREFIX}{run_id}-C{i:08d}", "expires_at": None}
+        return client.post("/licenses", json=payload, headers=headers)
+
+    def update(client: httpx.AsyncClient, i: int):
+        return client.put(f"/licenses/{license_key(i % seeded)}", json={"notes": f"bench {i}"}, headers=headers)
+
+    def delete(client: httpx.AsyncClient, i: int):
+        return client.delete(f"/licenses/{KEY_PREFIX}{run_id}-C{i:08d}", headers=headers)
+
+    return {
+        "validate": validate,
+        "validate_batch": validate_batch,
+        "list": list_page,
+        "get": get,
+        "create": create,
+        "update": update,
+        "delete": delete,
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, requests: int, concurrency: int) -> dict:
+    latencies: List[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker() -> None:
+        nonlocal next_index, errors
+        while next_index < requests:
+            index = next_index
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                response = await scenario(client, index)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "elapsed_seconds": elapsed,
+        "rps": len(ordered) / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "mean": statistics.fmean(ordered) * 1000 if ordered else 0.0,
+            "p50": percentile(ordered, 0.50) * 1000,
+            "p95": percentile(ordered, 0.95) * 1000,
+            "p99": percentile(ordered, 0.99) * 1000,
+            "max": ordered[-1] * 1000 if ordered else 0.0,
+        },
+    }
+
+
+async def seed(client: httpx.AsyncClient, headers: Dict[str, str], count: int, concurrency: int) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def create(index: int) -> None:
+        async with semaphore:
+            payload = {"owner": f"owner-{index % 10}", "key": license_key(index), "expires_at": None}
+            response = await client.post("/licenses", json=payload, headers=headers)
+            if response.status_code not in (200, 409):
+                response.raise_for_status()
+
+    await asyncio.gather(*(create(index) for index in range(count)))
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def main_async(args: argparse.Namespace) -> dict:
+    async with AsyncExitStack() as stack:
+        if args.url:
+            client = await stack.enter_async_context(httpx.AsyncClient(base_url=args.url, timeout=30.0))
+        else:
+            workdir = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix="ulb-bench-")))
+            os.environ["ULB_DATABASE_URL"] = f"sqlite:///{(workdir / 'bench.db').as_posix()}"
+            os.environ["ULB_ANTIVIRUS_HASH_DB"] = str(workdir / "antivirus_hashes.txt")
+            os.environ.setdefault("ULB_RATE_LIMIT_PER_MINUTE", str(10**9))
+            from backend.app import app
+
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            transport = httpx.ASGITransport(app=app)
+            client = await stack.enter_async_context(httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30.0))
+
+        response = await client.post("/auth/token", params={"password": args.password})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['token']}"}
+
+        await seed(client, headers, args.licenses, args.concurrency)
+        scenarios = build_scenarios(headers, args.licenses, run_id=f"{int(time.time())}")
+        results = {}
+        for name in args.scenarios:
+            results[name] = await run_scenario(client, scenarios[name], args.requests, args.concurrency)
+            stats = results[name]
+            latency = stats["latency_ms"]
+            print(
+                f"{name:<15} {stats['requests']:>7} req {stats['errors']:>5} err {stats['rps']:>9.1f} req/s "
+                f"p50 {latency['p50']:>7.2f} ms  p95 {latency['p95']:>7.2f} ms  p99 {latency['p99']:>7.2f} ms"
+            )
+
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "revision": git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "target": args.url or "in-process ASGI",
+        "concurrency": args.concurrency,
+        "requests_per_scenario": args.requests,
+        "seeded_licenses": args.licenses,
+        "scenarios": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the license backend.")
+    parser.add_argument("--url", help="Target a running server instead of the in-process app")
+    parser.add_argument("--password", default=os.environ.get("ULB_SECRET_KEY", "change-me-super-secret-key"))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per scenario")
+    parser.add_argument("--licenses", type=int, default=500, help="Licenses to seed before the run")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--output", type=Path, help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
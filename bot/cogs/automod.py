@@ -1,43 +1,62 @@
 from __future__ import annotations
 
-from pathlib import Path
+import asyncio
+import logging
 
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
+
+from ..utils.analysis import get_analyzer
+from ..utils.links import ALLOWED, get_link_filter
+from ..utils.matcher import WordList
+
+log = logging.getLogger("bot.automod")
+
+SPAM_EMOJIS = ("😂", "🤣", "😍")
 
 
 class AutoModCog(commands.Cog):
-    def __init__(self, bot: commands.Bot):
+    def __init__(self, bot: commands.Bot, config: dict):
         self.bot = bot
-        self.bad_words = self._load_words("bot/assets/bad_words.txt")
-        self.whitelisted_links = self._load_words("bot/assets/allowed_links.txt")
-
-    def _load_words(self, path: str) -> set[str]:
-        file = Path(path)
-        if not file.exists():
-            return set()
-        return {line.strip().lower() for line in file.read_text(encoding="utf-8").splitlines() if line}
+        self.config = config
+        self.analyzer = get_analyzer(bot)
+        self.bad_words = WordList(config.get("bad_words_file", "bot/assets/bad_words.txt"))
+        self.links = get_link_filter(bot, config)
+        self.reload_lists.change_interval(seconds=config.get("word_lists_reload_seconds", 30))
+        self.reload_lists.start()
+
+    def cog_unload(self) -> None:
+        self.reload_lists.cancel()
+
+    @tasks.loop(seconds=30)
+    async def reload_lists(self):
+        # Compiling thousands of entries stays off the event loop; each swap is a single assignment.
+        if await asyncio.to_thread(self.bad_words.reload_if_changed):
+            log.info("Liste %s rechargée (%d entrées)", self.bad_words.path, len(self.bad_words.matcher))
+        if await asyncio.to_thread(self.links.reload_if_changed):
+            stats = self.links.stats()
+            log.info("Listes de liens rechargées (%d autorisés, %d bloqués)", stats["allowed_domains"], stats["denied_domains"])
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
         if message.author.bot:
             return
-        lowered = message.content.lower()
-        if any(word in lowered for word in self.bad_words):
+        features = self.analyzer.analyze(message)
+        if self.bad_words.search(message.content):
             await message.delete()
             await message.channel.send(f"🚫 {message.author.mention}, langage inapproprié interdit.", delete_after=5)
-        if lowered.isupper() and len(lowered) > 5:
+        if features.all_caps and len(message.content) > 5:
             await message.delete()
             await message.channel.send("Merci d'éviter les majuscules.", delete_after=5)
-        if lowered.count("!") > 5:
+        if features.exclamations > 5:
+            await message.delete()
+        if any(features.emoji_counts.get(emoji, 0) > 5 for emoji in SPAM_EMOJIS):
             await message.delete()
-        if any(emoji in message.content for emoji in ["😂", "🤣", "😍"]) and message.content.count(emoji := "😂") > 5:
+        if any(self.links.verdict(link.host) != ALLOWED for link in features.links):
             await message.delete()
-        if "http" in lowered:
-            if not any(allowed in lowered for allowed in self.whitelisted_links):
-                await message.delete()
-                await message.channel.send("Lien non autorisé supprimé.", delete_after=5)
+            await message.channel.send("Lien non autorisé supprimé.", delete_after=5)
 
 
 async def setup(bot: commands.Bot):
-    await bot.add_cog(AutoModCog(bot))
+    config = bot.config.security
+    await bot.add_cog(AutoModCog(bot, config))
@@ -1,11 +1,20 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+from functools import partial
 from typing import Optional
 
+import aiohttp
 import discord
+from discord import app_commands
 from discord.ext import commands, tasks
 
+from ..utils.analysis import MessageFeatures, get_analyzer
+from ..utils.hashdb import sync_hash_database
+from ..utils.links import DENIED, get_link_filter
+from ..utils.moderation import BulkExecutor, BulkJob, ProgressCallback
+from ..utils.scanner import MALICIOUS, AttachmentScanner
 from ..utils.security import SecurityManager
 
 log = logging.getLogger("bot.security")
@@ -16,63 +25,164 @@ class SecurityCog(commands.Cog):
         self.bot = bot
         self.config = config
         self.manager = SecurityManager(config)
+        self.analyzer = get_analyzer(bot)
+        self.links = get_link_filter(bot, config)
+        self.scanner = AttachmentScanner(
+            self.manager.antivirus_hashes,
+            max_concurrency=config.get("attachment_scan_concurrency", 4),
+            max_bytes=config.get("attachment_max_bytes", 25 * 1024 * 1024),
+            chunk_size=config.get("attachment_chunk_bytes", 256 * 1024),
+        )
+        self._scans: set[asyncio.Task] = set()
+        self.executor = BulkExecutor(
+            concurrency=config.get("bulk_concurrency", 10),
+            rate_per_second=config.get("bulk_rate_per_second", 40),
+        )
         self.raid_monitor.start()
+        self.antivirus_sync.change_interval(minutes=config.get("antivirus_sync_minutes", 10))
+        self.antivirus_sync.start()
 
-    def cog_unload(self) -> None:
+    async def cog_unload(self) -> None:
         self.raid_monitor.cancel()
+        self.antivirus_sync.cancel()
+        for task in self._scans:
+            task.cancel()
+        await self.scanner.close()
 
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
-        self.manager.record_join()
-        if self.manager.is_raid():
-            log.warning("Raid detected - enabling lockdown mode")
+        self.manager.record_join(member.guild.id)
+        if self.manager.is_raid(member.guild.id):
+            log.warning("Raid detected in %s - enabling lockdown mode", member.guild.id)
             await self._lockdown(member.guild)
 
     async def _lockdown(self, guild: discord.Guild):
+        state = self.manager.guild(guild.id)
+        if state.lockdown is not None:
+            return
+        role = guild.default_role
+        saved: dict[int, Optional[bool]] = {}
+        jobs = []
         for channel in guild.text_channels:
+            overwrite = channel.overwrites_for(role)
+            if overwrite.send_messages is False:
+                continue
+            saved[channel.id] = overwrite.send_messages
+            overwrite.send_messages = False
+            jobs.append(BulkJob(channel.id, channel.name, partial(channel.set_permissions, role, overwrite=overwrite, reason="Raid lockdown")))
+        if not jobs:
+            return
+        # Set before the first await so joins arriving meanwhile do not start a second lockdown.
+        state.lockdown = saved
+        status: Optional[discord.Message] = None
+        try:
+            if guild.system_channel:
+                try:
+                    status = await guild.system_channel.send("⚠️ Raid détecté, verrouillage du serveur…")
+                except discord.HTTPException as exc:
+                    log.warning("Annonce du verrouillage impossible: %s", exc)
+
+            async def progress(done: int, total: int, failed: int):
+                if status:
+                    await status.edit(content=f"⚠️ Raid détecté, verrouillage du serveur… {done}/{total} salons")
+
+            result = await self.executor.run(jobs, progress)
+            for job, error in result.failed:
+                # Unchanged channels have nothing to restore.
+                saved.pop(job.bucket, None)
+                log.error("Missing permissions to lockdown %s: %s", job.label, error)
+        finally:
+            # Nothing locked means nothing to unlock: the next raid must be able to try again.
+            state.lockdown = saved or None
+        if status:
             try:
-                overwrite = channel.overwrites_for(guild.default_role)
-                overwrite.send_messages = False
-                await channel.set_permissions(guild.default_role, overwrite=overwrite, reason="Raid lockdown")
-            except discord.Forbidden:
-                log.error("Missing permissions to lockdown %s", channel.name)
-        await guild.system_channel.send("⚠️ Raid détecté, serveur verrouillé temporairement !") if guild.system_channel else None
+                await status.edit(
+                    content=f"⚠️ Raid détecté, serveur verrouillé temporairement ! ({result.done}/{result.total} salons, `/unlock` pour lever)"
+                )
+            except discord.HTTPException as exc:
+                log.warning("Annonce du verrouillage impossible: %s", exc)
+
+    async def _unlock(self, guild: discord.Guild, progress: ProgressCallback) -> Optional[tuple[int, int]]:
+        state = self.manager.guild(guild.id)
+        saved = state.lockdown
+        if saved is None:
+            return None
+        role = guild.default_role
+        jobs = []
+        for channel_id, previous in saved.items():
+            channel = guild.get_channel(channel_id)
+            if channel is None:
+                continue
+            overwrite = channel.overwrites_for(role)
+            overwrite.send_messages = previous
+            # An overwrite the lockdown created is removed rather than left empty.
+            target = None if overwrite.is_empty() else overwrite
+            jobs.append(BulkJob(channel.id, channel.name, partial(channel.set_permissions, role, overwrite=target, reason="Fin du verrouillage")))
+        result = await self.executor.run(jobs, progress)
+        failed = {job.bucket for job, _ in result.failed}
+        state.lockdown = {channel_id: saved[channel_id] for channel_id in failed} or None
+        return result.done, result.total
+
+    @app_commands.command(name="unlock", description="Lever le verrouillage anti-raid")
+    @app_commands.default_permissions(administrator=True)
+    async def unlock(self, interaction: discord.Interaction):
+        await interaction.response.send_message("🔓 Déverrouillage…", ephemeral=True)
+
+        async def progress(done: int, total: int, failed: int):
+            await interaction.edit_original_response(content=f"🔓 Déverrouillage… {done}/{total} salons")
+
+        outcome = await self._unlock(interaction.guild, progress)
+        if outcome is None:
+            await interaction.edit_original_response(content="Aucun verrouillage en cours.")
+            return
+        done, total = outcome
+        message = f"🔓 Serveur déverrouillé ({done}/{total} salons restaurés)."
+        if done < total:
+            message += " Relancez `/unlock` pour les salons restants."
+        await interaction.edit_original_response(content=message)
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
-        if message.author.bot:
+        if message.author.bot or message.guild is None:
             return
-        flags = self.manager.record_message(message.author.id, message.content)
-        caps_ratio = SecurityManager.caps_ratio(message.content)
-        emoji_count = SecurityManager.emoji_count(message.content)
+        guild_id = message.guild.id
+        if message.attachments:
+            # Downloads and hashing run in the background: the listener never waits on them.
+            task = asyncio.create_task(self.scan_attachments(message))
+            self._scans.add(task)
+            task.add_done_callback(self._scans.discard)
+        features = self.analyzer.analyze(message)
+        flags = self.manager.record_message(guild_id, message.author.id, message.content)
+        settings = self.manager.settings(guild_id)
         suspicious_score = 0
 
         if flags["spam"]:
             suspicious_score += 3
         if flags["flood"]:
             suspicious_score += 2
-        if caps_ratio > self.config.get("max_caps_percentage", 0.7):
+        if features.caps_ratio > settings.get("max_caps_percentage", 0.7):
             suspicious_score += 2
-        if emoji_count > self.config.get("emoji_spam_threshold", 8):
+        if features.emoji > settings.get("emoji_spam_threshold", 8):
             suspicious_score += 2
-        if "http" in message.content:
+        if features.has_link:
             suspicious_score += 1
-        if any(phrase in message.content.lower() for phrase in ["token", "nitro", "free", "http"]):
+        if features.has_lure:
             suspicious_score += 1
 
-        score = self.manager.suspicious_score(message.author.id, suspicious_score)
-        if score >= self.config.get("suspicious_score_threshold", 10):
+        score = self.manager.suspicious_score(guild_id, message.author.id, suspicious_score)
+        if score >= settings.get("suspicious_score_threshold", 10):
             await self.apply_sanction(message, score)
 
-        await self.detect_links(message)
+        await self.detect_links(message, features)
 
-    async def detect_links(self, message: discord.Message):
-        if "http" not in message.content:
-            return
+    async def detect_links(self, message: discord.Message, features: MessageFeatures):
         disallowed = ["grab", "steal", "phish"]
-        if any(keyword in message.content.lower() for keyword in disallowed):
-            await message.delete()
-            await self.warn_user(message.author, "Lien suspect détecté")
+        for link in features.links:
+            url = link.url.lower()
+            if self.links.verdict(link.host) == DENIED or any(keyword in url for keyword in disallowed):
+                await message.delete()
+                await self.warn_user(message.author, "Lien suspect détecté")
+                return
 
     async def warn_user(self, member: discord.Member, reason: str):
         try:
@@ -97,28 +207,73 @@ class SecurityCog(commands.Cog):
         except discord.Forbidden:
             log.error("Impossible de supprimer un message suspect")
 
-    @commands.Cog.listener()
-    async def on_message_delete(self, message: discord.Message):
-        if message.attachments:
-            await self.scan_attachments(message)
-
     async def scan_attachments(self, message: discord.Message):
-        for attachment in message.attachments:
-            file_bytes = await attachment.read(use_cached=True)
-            malicious = await self.manager.is_malicious_attachment(file_bytes)
-            if malicious:
-                await message.author.ban(reason="Malware détecté")
-                await message.channel.send(f"🚨 Malware détecté dans {attachment.filename}, utilisateur banni.")
+        results = await self.scanner.scan_all(message.attachments)
+        infected = [result.filename for result in results if result.verdict == MALICIOUS]
+        if not infected:
+            return
+        try:
+            await message.delete()
+        except discord.NotFound:
+            pass
+        except discord.Forbidden:
+            log.error("Impossible de supprimer un message suspect")
+        try:
+            await message.author.ban(reason="Malware détecté")
+        except discord.Forbidden:
+            log.error("Impossible de bannir %s (malware)", message.author)
+        await message.channel.send(f"🚨 Malware détecté dans {', '.join(infected)}, utilisateur banni.")
 
     @tasks.loop(seconds=60)
     async def raid_monitor(self):
-        if self.manager.is_raid():
-            log.info("Raid monitor triggered - lockdown in effect")
+        for guild_id in self.manager.raided_guilds():
+            log.info("Raid monitor triggered in %s - lockdown in effect", guild_id)
+        evicted = self.manager.prune()
+        if evicted:
+            stats = self.manager.stats()
+            log.debug(
+                "%d utilisateurs inactifs oubliés (%d suivis sur %d serveurs)",
+                evicted,
+                stats["tracked_users"],
+                stats["tracked_guilds"],
+            )
 
     @raid_monitor.before_loop
     async def before_raid_monitor(self):
         await self.bot.wait_until_ready()
 
+    @app_commands.command(name="security-stats", description="Mémoire utilisée par l'anti-spam")
+    @app_commands.default_permissions(administrator=True)
+    async def security_stats(self, interaction: discord.Interaction):
+        stats = self.manager.stats()
+        embed = discord.Embed(title="Anti-spam")
+        embed.add_field(name="Serveurs suivis", value=str(stats["tracked_guilds"]))
+        embed.add_field(name="Utilisateurs suivis", value=str(stats["tracked_users"]))
+        embed.add_field(name="Utilisateurs oubliés", value=str(stats["evicted_users"]))
+        embed.add_field(name="Mémoire estimée", value=f"{stats['approx_bytes'] / 1024:.0f} Kio")
+        scans = self.scanner.stats()
+        embed.add_field(
+            name="Pièces jointes",
+            value=f"{scans['scanned']} analysées, {scans['cache_hits']} en cache, {scans['skipped']} ignorées, {scans['malicious']} malveillantes",
+            inline=False,
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @tasks.loop(minutes=10)
+    async def antivirus_sync(self):
+        hashes = self.manager.antivirus_hashes
+        sync_url = self.config.get("antivirus_sync_url")
+        if not sync_url:
+            # Another process may own the sync: just pick up its replacement file.
+            hashes.reload_if_changed()
+            return
+        try:
+            async with aiohttp.ClientSession() as session:
+                if await sync_hash_database(hashes, sync_url, session):
+                    log.info("Base antivirus mise à jour (%d empreintes)", len(hashes))
+        except (aiohttp.ClientError, ValueError) as exc:
+            log.warning("Synchronisation antivirus impossible: %s", exc)
+
 
 async def setup(bot: commands.Bot):
     config = bot.config.security
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import string
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Tuple
+
+import discord
+from discord.ext import commands
+
+from .links import Link, extract_links
+
+LURE_WORDS: Tuple[str, ...] = ("token", "nitro", "free", "http")
+EMOJI_FLOOR = chr(10000)
+ASCII_UPPER = string.ascii_uppercase.encode()
+ASCII_LOWER = string.ascii_lowercase.encode()
+
+
+@dataclass
+class MessageFeatures:
+    """Everything the moderation cogs look at in a message, computed once."""
+
+    content: str
+    lowered: str
+    letters: int = 0
+    upper: int = 0
+    lower: int = 0
+    exclamations: int = 0
+    emoji: int = 0
+    emoji_counts: Dict[str, int] = field(default_factory=dict)
+    links: Tuple[Link, ...] = ()
+    has_lure: bool = False
+
+    @property
+    def has_link(self) -> bool:
+        return bool(self.links)
+
+    @property
+    def caps_ratio(self) -> float:
+        return self.upper / self.letters if self.letters else 0.0
+
+    @property
+    def all_caps(self) -> bool:
+        # Same rule as str.isupper(): at least one cased letter and no lowercase ones.
+        return self.upper > 0 and self.lower == 0
+
+    @classmethod
+    def from_content(cls, content: str) -> "MessageFeatures":
+        lowered = content.lower()
+        emoji_counts: Dict[str, int] = {}
+        if content.isascii():
+            # Most messages: count with bytes.translate deletions, entirely in C.
+            raw = content.encode("ascii")
+            upper = len(raw) - len(raw.translate(None, ASCII_UPPER))
+            lower = len(raw) - len(raw.translate(None, ASCII_LOWER))
+            letters = upper + lower
+        else:
+            letters = upper = lower = 0
+            for char in content:
+                if char.isalpha():
+                    letters += 1
+                    if char.isupper():
+                        upper += 1
+                    elif char.islower():
+                        lower += 1
+                # Same approximation as SecurityManager.emoji_count: code points above 10000.
+                if char > EMOJI_FLOOR:
+                    emoji_counts[char] = emoji_counts.get(char, 0) + 1
+        return cls(
+            content=content,
+            lowered=lowered,
+            letters=letters,
+            upper=upper,
+            lower=lower,
+            exclamations=content.count("!"),
+            emoji=sum(emoji_counts.values()),
+            emoji_counts=emoji_counts,
+            # The regex only runs on messages that can contain a URL at all.
+            links=extract_links(content) if "http" in lowered else (),
+            has_lure=any(word in lowered for word in LURE_WORDS),
+        )
+
+
+class MessageAnalyzer:
+    """Per-message feature cache shared by every cog listening to ``on_message``.
+
+    Entries are keyed by message id, so the first listener pays for the scan and the
+    others get the same ``MessageFeatures``. Only the most recent ``maxsize`` messages
+    are kept.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._cache: "OrderedDict[int, MessageFeatures]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def analyze(self, message: discord.Message) -> MessageFeatures:
+        features = self._cache.get(message.id)
+        if features is not None and features.content == message.content:
+            self.hits += 1
+            self._cache.move_to_end(message.id)
+            return features
+        self.misses += 1
+        features = MessageFeatures.from_content(message.content)
+        self._cache[message.id] = features
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return features
+
+
+def get_analyzer(bot: commands.Bot) -> MessageAnalyzer:
+    """Return the bot-wide analyzer, creating it on first use."""
+    analyzer = getattr(bot, "message_analyzer", None)
+    if analyzer is None:
+        analyzer = MessageAnalyzer()
+        bot.message_analyzer = analyzer
+    return analyzer
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import heapq
+import mmap
+import os
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Set
+
+import aiohttp
+
+# The file format lives in one place, shared with the backend that produces it.
+from backend.hashformat import (
+    DIGEST_SIZE,
+    HEADER,
+    MAGIC,
+    VERSION,
+    bloom_positions,
+    digests_offset,
+    parse_hex_digests,
+    write_hash_database,
+)
+
+# The bot keeps its own copy: the backend compiles and serves antivirus_hashes.bin
+# next to its text source, and two writers must never share one file.
+DEFAULT_HASH_DB_PATH = "bot/data/antivirus_hashes.bin"
+
+
+def _replace_file(path: Path, content: bytes) -> None:
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(content)
+    os.replace(tmp_path, path)
+
+
+class HashDatabase:
+    """Memory-mapped, sorted SHA-256 digests with a Bloom filter in front.
+
+    Several bot processes opening the same file share one copy in the page cache.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self.count = 0
+        self.etag: Optional[str] = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._bloom_offset = HEADER.size
+        self._bloom_bits = 0
+        self._bloom_hashes = 0
+        self._digests_offset = HEADER.size
+        self._stat: Optional[tuple] = None
+        if path is not None and path.exists():
+            self._open()
+
+    def _open(self) -> None:
+        assert self.path is not None
+        with self.path.open("rb") as fp:
+            stat = os.fstat(fp.fileno())
+            if stat.st_size < HEADER.size:
+                raise ValueError(f"{self.path} is not a hash database")
+            mapped = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, count, bloom_bits, bloom_hashes, _ = HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC or version != VERSION:
+            mapped.close()
+            raise ValueError(f"{self.path} is not a version {VERSION} hash database")
+        old, self._mmap = self._mmap, mapped
+        self.count = count
+        self._bloom_bits = bloom_bits
+        self._bloom_hashes = bloom_hashes
+        self._digests_offset = digests_offset(bloom_bits)
+        self._stat = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        etag_path = self.path.with_name(self.path.name + ".etag")
+        self.etag = etag_path.read_text().strip() if etag_path.exists() else None
+        if old is not None:
+            old.close()
+
+    def reload_if_changed(self) -> bool:
+        """Remap the file if another process replaced it; cheap enough to call often."""
+        if self.path is None or not self.path.exists():
+            return False
+        stat = self.path.stat()
+        if (stat.st_ino, stat.st_mtime_ns, stat.st_size) == self._stat:
+            return False
+        self._open()
+        return True
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, digest: object) -> bool:
+        if isinstance(digest, str):
+            try:
+                digest = bytes.fromhex(digest)
+            except ValueError:
+                return False
+        if not isinstance(digest, bytes) or len(digest) != DIGEST_SIZE or self._mmap is None or not self.count:
+            return False
+        mapped = self._mmap
+        for position in bloom_positions(digest, self._bloom_bits, self._bloom_hashes):
+            if not mapped[self._bloom_offset + (position >> 3)] & (1 << (position & 7)):
+                return False
+        low, high = 0, self.count
+        base = self._digests_offset
+        while low < high:
+            mid = (low + high) // 2
+            start = base + mid * DIGEST_SIZE
+            candidate = mapped[start : start + DIGEST_SIZE]
+            if candidate < digest:
+                low = mid + 1
+            elif candidate > digest:
+                high = mid
+            else:
+                return True
+        return False
+
+    def __iter__(self) -> Iterator[bytes]:
+        if self._mmap is None:
+            return
+        for index in range(self.count):
+            start = self._digests_offset + index * DIGEST_SIZE
+            yield self._mmap[start : start + DIGEST_SIZE]
+
+    async def apply_delta(self, added: Iterable[bytes], removed: Set[bytes], etag: str) -> None:
+        """Write a new file from the current digests plus a delta, then remap it.
+
+        The merge and the write run in a worker thread; the remap stays on the event loop
+        so that lookups never see the old mapping closed under them.
+        """
+        assert self.path is not None
+        await asyncio.to_thread(self._write_delta, list(added), removed, etag)
+        self._open()
+
+    async def replace(self, content: bytes, etag: Optional[str]) -> None:
+        assert self.path is not None
+        if len(content) < HEADER.size or HEADER.unpack_from(content, 0)[:2] != (MAGIC, VERSION):
+            raise ValueError("Downloaded hash database has an unexpected format")
+        await asyncio.to_thread(self._write_file, content, etag)
+        self._open()
+
+    def _write_delta(self, added: List[bytes], removed: Set[bytes], etag: str) -> None:
+        assert self.path is not None
+        merged = (digest for digest in heapq.merge(iter(self), sorted(added)) if digest not in removed)
+        write_hash_database(merged, self.path, presorted=True)
+        self._write_etag(etag)
+
+    def _write_file(self, content: bytes, etag: Optional[str]) -> None:
+        assert self.path is not None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        _replace_file(self.path, content)
+        self._write_etag(etag)
+
+    def _write_etag(self, etag: Optional[str]) -> None:
+        # Written after the data: a crash in between leaves the old tag, and re-applying
+        # a delta on top of the digests it already added and removed changes nothing.
+        assert self.path is not None
+        etag_path = self.path.with_name(self.path.name + ".etag")
+        if etag:
+            _replace_file(etag_path, etag.encode())
+        elif etag_path.exists():
+            etag_path.unlink()
+
+
+def load_hash_database(path: str | Path) -> HashDatabase:
+    """Open a binary hash database; plain-text hex lists are compiled next to the source."""
+    if not path:
+        return HashDatabase()
+    source = Path(path)
+    if source.suffix != ".txt":
+        return HashDatabase(source)
+    compiled = source.with_suffix(".bin")
+    if source.exists() and (not compiled.exists() or compiled.stat().st_mtime < source.stat().st_mtime):
+        with source.open("r", encoding="utf-8") as fp:
+            write_hash_database(parse_hex_digests(fp), compiled)
+    return HashDatabase(compiled)
+
+
+async def sync_hash_database(database: HashDatabase, base_url: str, session: aiohttp.ClientSession) -> bool:
+    """Bring ``database`` up to date with the backend, preferring a delta over a full download.
+
+    Returns True when the local file changed.
+    """
+    base_url = base_url.rstrip("/")
+    if database.path is None:
+        return False
+    if database.etag:
+        async with session.get(f"{base_url}/delta", params={"since": database.etag}) as resp:
+            if resp.status == 200:
+                data = await resp.json()
+                if data["etag"] == database.etag:
+                    return False
+                added = [bytes.fromhex(value) for value in data["added"]]
+                removed = {bytes.fromhex(value) for value in data["removed"]}
+                await database.apply_delta(added, removed, data["etag"])
+                return True
+    headers = {"If-None-Match": database.etag} if database.etag else {}
+    async with session.get(f"{base_url}/db", headers=headers) as resp:
+        if resp.status == 304:
+            return False
+        resp.raise_for_status()
+        content = await resp.read()
+        await database.replace(content, resp.headers.get("ETag", "").strip('"') or hashlib.sha256(content).hexdigest()[:32])
+    return True
@@ -1,29 +1,54 @@
 from __future__ import annotations
 
-import asyncio
 import hashlib
 from typing import Any, Dict
 
 import aiohttp
 
+DEFAULT_BATCH_SIZE = 100
+# Matches MAX_BATCH_VALIDATION_ITEMS on the backend, which rejects larger batches.
+MAX_BATCH_SIZE = 500
+
 
 class LicenseValidationError(Exception):
     """Raised when license validation fails."""
 
 
-async def validate_license(config: Dict[str, Any], guild_id: str) -> Dict[str, Any]:
-    payload = {
+def _payload(config: Dict[str, Any], guild_id: str) -> Dict[str, str]:
+    return {
         "key": config["key"],
         "guild_id": guild_id,
         "machine_fingerprint": hashlib.sha256(guild_id.encode()).hexdigest(),
     }
+
+
+async def validate_license(config: Dict[str, Any], guild_id: str) -> Dict[str, Any]:
     async with aiohttp.ClientSession() as session:
-        async with session.post(config["endpoint"], json=payload) as resp:
+        async with session.post(config["endpoint"], json=_payload(config, guild_id)) as resp:
             data = await resp.json()
             if not data.get("valid"):
                 raise LicenseValidationError(data.get("reason", "Unknown error"))
             return data
 
 
+async def validate_licenses(config: Dict[str, Any], guild_ids: list[str]) -> list[Dict[str, Any]]:
+    endpoint = config.get("batch_endpoint") or f"{config['endpoint'].rstrip('/')}/batch"
+    batch_size = min(MAX_BATCH_SIZE, max(1, int(config.get("batch_size", DEFAULT_BATCH_SIZE))))
+    results: list[Dict[str, Any]] = []
+    async with aiohttp.ClientSession() as session:
+        for start in range(0, len(guild_ids), batch_size):
+            chunk = guild_ids[start : start + batch_size]
+            payload = {"items": [_payload(config, gid) for gid in chunk]}
+            async with session.post(endpoint, json=payload) as resp:
+                data = await resp.json()
+            for guild_id, result in zip(chunk, data.get("results", [])):
+                if not result.get("valid"):
+                    raise LicenseValidationError(f"{result.get('reason', 'Unknown error')} (guild {guild_id})")
+                results.append(result)
+            if len(data.get("results", [])) != len(chunk):
+                raise LicenseValidationError(data.get("detail", "Unexpected batch validation response"))
+    return results
+
+
 async def ensure_license(config: Dict[str, Any], guild_ids: list[str]) -> None:
-    await asyncio.gather(*(validate_license(config, gid) for gid in guild_ids or ["standalone"]))
+    await validate_licenses(config, guild_ids or ["standalone"])
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import os
+import re
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+from discord.ext import commands
+
+URL_RE = re.compile(r"https?://[^\s<>\"'`]+", re.IGNORECASE)
+TRAILING = ".,;:!?)]}>*_~|"
+
+ALLOWED = "allow"
+DENIED = "deny"
+UNKNOWN = "unknown"
+
+_END = None  # Trie key marking the end of a listed domain; labels are never None.
+
+
+class Link(NamedTuple):
+    url: str
+    host: Optional[str]
+
+
+def normalize_host(host: str) -> Optional[str]:
+    """Lowercase ASCII form of ``host``; internationalized names become punycode (``xn--``)."""
+    host = host.strip().rstrip(".").lower()
+    if not host:
+        return None
+    if not host.isascii():
+        try:
+            host = host.encode("idna").decode("ascii")
+        except UnicodeError:
+            return None
+    return host
+
+
+def extract_links(text: str) -> Tuple[Link, ...]:
+    links = []
+    for match in URL_RE.finditer(text):
+        url = match.group().rstrip(TRAILING)
+        try:
+            hostname = urlsplit(url).hostname
+        except ValueError:
+            hostname = None
+        links.append(Link(url, normalize_host(hostname) if hostname else None))
+    return tuple(links)
+
+
+class DomainTrie:
+    """Domains stored label by label from the TLD down.
+
+    A lookup walks at most one node per label of the host, and an entry matches the
+    domain itself and all of its subdomains (``discord.com`` covers ``cdn.discord.com``
+    but not ``evildiscord.com``).
+    """
+
+    def __init__(self, domains: Iterable[str] = ()):
+        self._root: Dict[Any, Any] = {}
+        self.size = 0
+        for domain in domains:
+            self.add(domain)
+
+    def add(self, entry: str) -> None:
+        entry = entry.strip()
+        if not entry or entry.startswith("#"):
+            return
+        if "://" in entry:
+            entry = urlsplit(entry).hostname or ""
+        host = normalize_host(entry.split("/", 1)[0].removeprefix("*."))
+        if not host:
+            return
+        node = self._root
+        for label in reversed(host.split(".")):
+            node = node.setdefault(label, {})
+        if _END not in node:
+            node[_END] = True
+            self.size += 1
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, host: str) -> bool:
+        node = self._root
+        for label in reversed(host.split(".")):
+            node = node.get(label)
+            if node is None:
+                return False
+            if _END in node:
+                return True
+        return False
+
+
+class _Rules:
+    __slots__ = ("allow", "deny", "verdicts", "cache_size")
+
+    def __init__(self, allow: DomainTrie, deny: DomainTrie, cache_size: int):
+        self.allow = allow
+        self.deny = deny
+        self.verdicts: "OrderedDict[str, str]" = OrderedDict()
+        self.cache_size = cache_size
+
+
+def _read_domains(path: Path) -> DomainTrie:
+    if not path.exists():
+        return DomainTrie()
+    return DomainTrie(path.read_text(encoding="utf-8").splitlines())
+
+
+def _file_stat(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class LinkFilter:
+    """Allow/deny verdicts per domain, from two list files.
+
+    The denylist wins over the allowlist. Verdicts are cached per host in an LRU that
+    belongs to the current rules, so ``reload_if_changed`` swaps tries and cache together
+    in a single assignment.
+    """
+
+    def __init__(self, allow_path: str | Path, deny_path: str | Path, cache_size: int = 4096):
+        self.allow_path = Path(allow_path)
+        self.deny_path = Path(deny_path)
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._stats: Tuple[Optional[Tuple[int, int]], ...] = ()
+        self._rules = _Rules(DomainTrie(), DomainTrie(), cache_size)
+        self.reload_if_changed()
+
+    def reload_if_changed(self) -> bool:
+        stats = (_file_stat(self.allow_path), _file_stat(self.deny_path))
+        if stats == self._stats:
+            return False
+        self._rules = _Rules(_read_domains(self.allow_path), _read_domains(self.deny_path), self.cache_size)
+        self._stats = stats
+        return True
+
+    def verdict(self, host: Optional[str]) -> str:
+        if not host:
+            return UNKNOWN
+        rules = self._rules
+        cached = rules.verdicts.get(host)
+        if cached is not None:
+            self.hits += 1
+            rules.verdicts.move_to_end(host)
+            return cached
+        self.misses += 1
+        if host in rules.deny:
+            result = DENIED
+        elif host in rules.allow:
+            result = ALLOWED
+        else:
+            result = UNKNOWN
+        rules.verdicts[host] = result
+        if len(rules.verdicts) > rules.cache_size:
+            rules.verdicts.popitem(last=False)
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        rules = self._rules
+        return {
+            "allowed_domains": len(rules.allow),
+            "denied_domains": len(rules.deny),
+            "cached_verdicts": len(rules.verdicts),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def get_link_filter(bot: commands.Bot, config: dict) -> LinkFilter:
+    """Return the bot-wide link filter, creating it from ``config`` on first use."""
+    link_filter = getattr(bot, "link_filter", None)
+    if link_filter is None:
+        link_filter = LinkFilter(
+            config.get("allowed_links_file", "bot/assets/allowed_links.txt"),
+            config.get("blocked_links_file", "bot/assets/blocked_links.txt"),
+        )
+        bot.link_filter = link_filter
+    return link_filter
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import os
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Invisible characters used to split words past naive filters.
+ZERO_WIDTH = dict.fromkeys(map(ord, "\u00ad\u180e\u200b\u200c\u200d\u200e\u200f\u2060\u2061\u2062\u2063\u2064\ufeff"))
+LEET = str.maketrans({"0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t", "8": "b", "@": "a", "$": "s"})
+
+# Match modes, chosen per entry in the list file:
+#   word    whole word only           (default)
+#   *word   word ending with "word"
+#   word*   word starting with "word"
+#   *word*  anywhere, even inside another word
+WHOLE, SUFFIX, PREFIX, ANYWHERE = range(4)
+
+
+def fold(text: str, obfuscation: bool = True) -> str:
+    """Lowercase ``text``; with ``obfuscation`` also drop accents, zero-width characters and leet digits."""
+    if not obfuscation:
+        return text.lower()
+    text = unicodedata.normalize("NFKD", text.translate(ZERO_WIDTH))
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return text.casefold().translate(LEET)
+
+
+@dataclass(frozen=True)
+class Match:
+    pattern: str
+    start: int
+    end: int
+
+
+class Matcher:
+    """Aho-Corasick automaton: every pattern is found in a single pass over the text.
+
+    Build cost is linear in the total pattern length and a scan is linear in the text
+    length plus the number of hits, however many patterns there are.
+    """
+
+    def __init__(self, patterns: Iterable[str] = (), word_boundaries: bool = True, obfuscation: bool = True):
+        self.word_boundaries = word_boundaries
+        self.obfuscation = obfuscation
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[str, int, int]]] = [[]]
+        self.size = 0
+        for raw in patterns:
+            self._add(raw)
+        self._link()
+
+    def _add(self, raw: str) -> None:
+        raw = raw.strip()
+        if not raw or raw.startswith("#"):
+            return
+        mode = WHOLE
+        if self.word_boundaries:
+            leading, trailing = raw.startswith("*"), raw.endswith("*") and len(raw) > 1
+            raw = raw.strip("*")
+            mode = ANYWHERE if leading and trailing else SUFFIX if leading else PREFIX if trailing else WHOLE
+        else:
+            mode = ANYWHERE
+        pattern = fold(raw, self.obfuscation)
+        if not pattern:
+            return
+        state = 0
+        for char in pattern:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((raw.lower(), len(pattern), mode))
+        self.size += 1
+
+    def _link(self) -> None:
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                # Inherit the outputs of the longest proper suffix so scans never walk fail links.
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def __len__(self) -> int:
+        return self.size
+
+    def finditer(self, text: str) -> Iterator[Match]:
+        if not self.size:
+            return
+        folded = fold(text, self.obfuscation)
+        goto, fail, out = self._goto, self._fail, self._out
+        check = self.word_boundaries
+        length = len(folded)
+        state = 0
+        for index, char in enumerate(folded):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not out[state]:
+                continue
+            end = index + 1
+            for pattern, size, mode in out[state]:
+                start = end - size
+                if check and mode != ANYWHERE:
+                    if mode != SUFFIX and start > 0 and folded[start - 1].isalnum():
+                        continue
+                    if mode != PREFIX and end < length and folded[end].isalnum():
+                        continue
+                yield Match(pattern, start, end)
+
+    def search(self, text: str) -> Optional[Match]:
+        return next(self.finditer(text), None)
+
+
+class WordList:
+    """A ``Matcher`` compiled from a text file, recompiled when the file changes.
+
+    ``reload_if_changed`` builds the new automaton completely before swapping it in with
+    a single assignment, so concurrent readers always see either the old or the new one.
+    """
+
+    def __init__(self, path: str | Path, word_boundaries: bool = True, obfuscation: bool = True):
+        self.path = Path(path)
+        self.word_boundaries = word_boundaries
+        self.obfuscation = obfuscation
+        self.matcher = Matcher(word_boundaries=word_boundaries, obfuscation=obfuscation)
+        self._stat: Optional[Tuple[int, int]] = None
+        self.reload_if_changed()
+
+    def _file_stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload_if_changed(self) -> bool:
+        stat = self._file_stat()
+        if stat == self._stat:
+            return False
+        lines = self.path.read_text(encoding="utf-8").splitlines() if stat else []
+        self.matcher = Matcher(lines, word_boundaries=self.word_boundaries, obfuscation=self.obfuscation)
+        self._stat = stat
+        return True
+
+    def search(self, text: str) -> Optional[Match]:
+        return self.matcher.search(text)
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import aiohttp
+import discord
+
+log = logging.getLogger("bot.moderation")
+
+ProgressCallback = Callable[[int, int, int], Awaitable[None]]
+
+
+@dataclass
+class BulkJob:
+    # Discord rate-limits per route and major parameter: for permission edits that is the channel.
+    bucket: Hashable
+    label: str
+    action: Callable[[], Awaitable[object]]
+
+
+@dataclass
+class BulkResult:
+    total: int
+    done: int = 0
+    failed: List[Tuple[BulkJob, str]] = field(default_factory=list)
+
+
+class BulkExecutor:
+    """Runs many Discord API calls concurrently without tripping the rate limits.
+
+    Calls start at most ``rate_per_second`` times per second across every run (below
+    the 50/s global limit), at most ``concurrency`` are in flight, and calls sharing a
+    bucket run one at a time. 429 and 5xx responses and network errors are retried with
+    exponential backoff and jitter; other errors (403, 404...) fail the job at once.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 10,
+        rate_per_second: float = 40.0,
+        max_attempts: int = 4,
+        base_delay: float = 1.0,
+        progress_interval: float = 2.0,
+    ):
+        self.concurrency = concurrency
+        self.interval = 1.0 / rate_per_second
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.progress_interval = progress_interval
+        self._next_slot = 0.0
+        self._semaphore = asyncio.Semaphore(concurrency)
+        # bucket -> [lock, jobs holding or waiting for it]
+        self._buckets: Dict[Hashable, list] = {}
+
+    async def _pace(self) -> None:
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def _attempt(self, job: BulkJob) -> Optional[str]:
+        for attempt in range(1, self.max_attempts + 1):
+            await self._pace()
+            try:
+                await job.action()
+                return None
+            except discord.HTTPException as exc:
+                if exc.status != 429 and exc.status < 500:
+                    return f"{exc.status} {exc.text or exc}"
+                error = f"{exc.status} {exc.text or exc}"
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                error = str(exc) or type(exc).__name__
+            if attempt < self.max_attempts:
+                delay = self.base_delay * 2 ** (attempt - 1) + random.uniform(0, self.base_delay)
+                log.debug("%s: tentative %d échouée (%s), nouvel essai dans %.1fs", job.label, attempt, error, delay)
+                await asyncio.sleep(delay)
+        return error
+
+    async def _run_job(self, job: BulkJob) -> Optional[str]:
+        entry = self._buckets.setdefault(job.bucket, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                return await self._attempt(job)
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._buckets[job.bucket]
+
+    async def run(self, jobs: Sequence[BulkJob], on_progress: Optional[ProgressCallback] = None) -> BulkResult:
+        result = BulkResult(total=len(jobs))
+        loop = asyncio.get_running_loop()
+        last_report = loop.time()
+        reporting = False
+
+        async def worker(job: BulkJob) -> None:
+            nonlocal last_report, reporting
+            async with self._semaphore:
+                error = await self._run_job(job)
+            if error is None:
+                result.done += 1
+            else:
+                result.failed.append((job, error))
+                log.warning("%s: échec définitif (%s)", job.label, error)
+            # Progress updates are API calls too: throttle them and never stack them.
+            if on_progress and not reporting and loop.time() - last_report >= self.progress_interval:
+                reporting, last_report = True, loop.time()
+                try:
+                    await self._report(on_progress, result)
+                finally:
+                    reporting = False
+
+        await asyncio.gather(*(worker(job) for job in jobs))
+        if on_progress:
+            await self._report(on_progress, result)
+        return result
+
+    @staticmethod
+    async def _report(on_progress: ProgressCallback, result: BulkResult) -> None:
+        # Best effort: a status message that cannot be edited must not abort the run.
+        try:
+            await on_progress(result.done + len(result.failed), result.total, len(result.failed))
+        except discord.HTTPException as exc:
+            log.debug("Progression non publiée: %s", exc)
+        except Exception:
+            log.exception("Erreur dans le suivi de progression")
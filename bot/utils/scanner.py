@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional
+
+import aiohttp
+import discord
+
+from .hashdb import HashDatabase
+
+log = logging.getLogger("bot.scanner")
+
+CLEAN = "clean"
+MALICIOUS = "malicious"
+SKIPPED = "skipped"
+
+
+class ScanResult(NamedTuple):
+    attachment_id: int
+    filename: str
+    verdict: str
+    digest: Optional[bytes] = None
+    reason: Optional[str] = None
+
+
+class AttachmentScanner:
+    """Hashes attachments as they download and looks the digests up in the hash database.
+
+    Bodies are streamed in ``chunk_size`` pieces and fed to SHA-256 in a thread pool
+    (hashlib releases the GIL on large buffers), so neither memory nor the event loop
+    scale with the upload size. At most ``max_concurrency`` downloads run at once across
+    all guilds, attachments above ``max_bytes`` are skipped, and digests are cached by
+    attachment id; the verdict itself is re-read from the database on every lookup so a
+    database update applies to cached attachments too.
+    """
+
+    def __init__(
+        self,
+        hashes: HashDatabase,
+        max_concurrency: int = 4,
+        max_bytes: int = 25 * 1024 * 1024,
+        chunk_size: int = 256 * 1024,
+        cache_size: int = 4096,
+    ):
+        self.hashes = hashes
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.cache_size = cache_size
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="attachment-scan")
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._digests: "OrderedDict[int, bytes]" = OrderedDict()
+        self._inflight: Dict[int, "asyncio.Task[Optional[bytes]]"] = {}
+        self.scanned = 0
+        self.cache_hits = 0
+        self.skipped = 0
+        self.malicious = 0
+        self.bytes_hashed = 0
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        self._executor.shutdown(wait=False)
+
+    def _result(self, attachment: discord.Attachment, digest: bytes) -> ScanResult:
+        if digest in self.hashes:
+            self.malicious += 1
+            return ScanResult(attachment.id, attachment.filename, MALICIOUS, digest)
+        return ScanResult(attachment.id, attachment.filename, CLEAN, digest)
+
+    async def scan(self, attachment: discord.Attachment) -> ScanResult:
+        digest = self._digests.get(attachment.id)
+        if digest is not None:
+            self.cache_hits += 1
+            self._digests.move_to_end(attachment.id)
+            return self._result(attachment, digest)
+        if attachment.size > self.max_bytes:
+            self.skipped += 1
+            return ScanResult(attachment.id, attachment.filename, SKIPPED, reason="too_large")
+        # Listeners for the same message share one download.
+        task = self._inflight.get(attachment.id)
+        if task is None:
+            task = asyncio.ensure_future(self._download_digest(attachment))
+            self._inflight[attachment.id] = task
+            task.add_done_callback(lambda _: self._inflight.pop(attachment.id, None))
+        try:
+            digest = await asyncio.shield(task)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            log.warning("Analyse de %s impossible: %s", attachment.filename, exc)
+            self.skipped += 1
+            return ScanResult(attachment.id, attachment.filename, SKIPPED, reason="download_failed")
+        except Exception:
+            # Scans run in background tasks: a failure must end up in a result, not unretrieved.
+            log.exception("Erreur pendant l'analyse de %s", attachment.filename)
+            self.skipped += 1
+            return ScanResult(attachment.id, attachment.filename, SKIPPED, reason="scan_failed")
+        if digest is None:
+            self.skipped += 1
+            return ScanResult(attachment.id, attachment.filename, SKIPPED, reason="too_large")
+        return self._result(attachment, digest)
+
+    async def scan_all(self, attachments: List[discord.Attachment]) -> List[ScanResult]:
+        return list(await asyncio.gather(*(self.scan(attachment) for attachment in attachments)))
+
+    async def _download_digest(self, attachment: discord.Attachment) -> Optional[bytes]:
+        loop = asyncio.get_running_loop()
+        async with self._semaphore:
+            if self._session is None:
+                self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=120))
+            hasher = hashlib.sha256()
+            received = 0
+            async with self._session.get(attachment.url) as resp:
+                resp.raise_for_status()
+                async for chunk in resp.content.iter_chunked(self.chunk_size):
+                    received += len(chunk)
+                    if received > self.max_bytes:
+                        # The declared size was wrong: stop downloading rather than trust it.
+                        return None
+                    await loop.run_in_executor(self._executor, hasher.update, chunk)
+        digest = hasher.digest()
+        self.scanned += 1
+        self.bytes_hashed += received
+        self._digests[attachment.id] = digest
+        if len(self._digests) > self.cache_size:
+            self._digests.popitem(last=False)
+        return digest
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "scanned": self.scanned,
+            "cache_hits": self.cache_hits,
+            "skipped": self.skipped,
+            "malicious": self.malicious,
+            "bytes_hashed": self.bytes_hashed,
+            "in_flight": len(self._inflight),
+        }
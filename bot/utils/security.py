@@ -2,74 +2,244 @@ from __future__ import annotations
 
 import asyncio
 import hashlib
-from collections import defaultdict, deque
-from datetime import datetime, timedelta
-from pathlib import Path
-from typing import Deque, Dict
+import sys
+import time
+from array import array
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional
 
 import aiohttp
 
+from .hashdb import DEFAULT_HASH_DB_PATH, HashDatabase, load_hash_database
+
+
+class UserActivity:
+    """Recent activity of one user, in a fixed-size ring of (timestamp, content fingerprint).
+
+    The ring holds the last ``size`` messages, so a user never takes more than a few
+    hundred bytes however much they post; spam and flood checks only read the ring.
+    """
+
+    __slots__ = ("last_seen", "score", "_times", "_prints", "_next")
+
+    def __init__(self, size: int, now: float):
+        self.last_seen = now
+        self.score = 0
+        self._times = array("d", [float("-inf")]) * size
+        self._prints = array("q", [0]) * size
+        self._next = 0
+
+    def record(self, now: float, fingerprint: int) -> None:
+        index = self._next
+        self._times[index] = now
+        self._prints[index] = fingerprint
+        self._next = (index + 1) % len(self._times)
+
+    def burst(self, count: int, window: float, now: float) -> bool:
+        """Whether the last ``count`` messages all fall within ``window`` seconds."""
+        # Timestamps only grow, so it is enough to look at the count-th most recent one.
+        return now - self._times[(self._next - count) % len(self._times)] <= window
+
+    def repeated(self, fingerprint: int, count: int, window: float, now: float) -> bool:
+        """Whether ``fingerprint`` was seen at least ``count`` times within ``window`` seconds."""
+        if self._prints.count(fingerprint) < count:
+            return False
+        recent = [seen for stamp, seen in zip(self._times, self._prints) if now - stamp <= window]
+        return recent.count(fingerprint) >= count
+
+    def nbytes(self) -> int:
+        return sys.getsizeof(self) + sys.getsizeof(self._times) + sys.getsizeof(self._prints)
+
+
+class GuildState:
+    """Moderation state and thresholds of a single guild.
+
+    ``settings`` is the ``security`` config section with the guild's overrides from
+    ``security.guilds`` applied on top.
+    """
+
+    __slots__ = (
+        "guild_id",
+        "settings",
+        "last_seen",
+        "joins",
+        "users",
+        "evicted_users",
+        "history_size",
+        "max_tracked_users",
+        "user_idle_seconds",
+        "raid_threshold",
+        "raid_window",
+        "spam_threshold",
+        "spam_window",
+        "flood_threshold",
+        "flood_window",
+        "lockdown",
+    )
+
+    def __init__(self, guild_id: int, settings: Dict[str, Any], now: float):
+        self.guild_id = guild_id
+        self.settings = settings
+        self.last_seen = now
+        self.joins: Deque[float] = deque()
+        # Least recently active first: idle users are evicted from the front.
+        self.users: "OrderedDict[int, UserActivity]" = OrderedDict()
+        self.evicted_users = 0
+        self.raid_threshold = settings.get("raid_threshold", 5)
+        self.raid_window = settings.get("raid_window_seconds", 30)
+        self.spam_threshold = settings.get("spam_threshold", 5)
+        self.spam_window = settings.get("spam_window_seconds", 8)
+        self.flood_threshold = settings.get("flood_duplicate_threshold", 4)
+        self.flood_window = settings.get("flood_window_seconds", 300)
+        self.history_size = max(settings.get("user_history_size", 16), self.spam_threshold, self.flood_threshold)
+        self.max_tracked_users = settings.get("max_tracked_users", 100_000)
+        self.user_idle_seconds = settings.get("user_idle_seconds", 900)
+        # channel id -> the default role's send_messages before the lockdown (None: not set)
+        self.lockdown: Optional[Dict[int, Optional[bool]]] = None
+
+    def record_join(self, now: float) -> None:
+        self.joins.append(now)
+        while self.joins and now - self.joins[0] > self.raid_window:
+            self.joins.popleft()
+
+    def is_raid(self, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        while self.joins and now - self.joins[0] > self.raid_window:
+            self.joins.popleft()
+        return len(self.joins) >= self.raid_threshold
+
+    def _user(self, user_id: int, now: float) -> UserActivity:
+        activity = self.users.get(user_id)
+        if activity is None:
+            activity = self.users[user_id] = UserActivity(self.history_size, now)
+        else:
+            activity.last_seen = now
+            self.users.move_to_end(user_id)
+        self.prune(now)
+        return activity
+
+    def prune(self, now: float) -> int:
+        """Forget users idle for ``user_idle_seconds`` (and the oldest ones past ``max_tracked_users``)."""
+        evicted = 0
+        users = self.users
+        while users:
+            user_id, activity = next(iter(users.items()))
+            if len(users) <= self.max_tracked_users and now - activity.last_seen <= self.user_idle_seconds:
+                break
+            del users[user_id]
+            evicted += 1
+        self.evicted_users += evicted
+        return evicted
+
+    def record_message(self, user_id: int, content: str, now: float) -> Dict[str, bool]:
+        activity = self._user(user_id, now)
+        # Python's keyed str hash: a fixed-size fingerprint instead of keeping the text.
+        fingerprint = hash(content)
+        activity.record(now, fingerprint)
+        spam = activity.burst(self.spam_threshold, self.spam_window, now)
+        flood = activity.repeated(fingerprint, self.flood_threshold, self.flood_window, now)
+        return {"spam": spam, "flood": flood}
+
+    def suspicious_score(self, user_id: int, amount: int, now: float) -> int:
+        activity = self._user(user_id, now)
+        activity.score += amount
+        return activity.score
+
+    def idle(self, now: float) -> bool:
+        # A locked guild keeps its state: it holds the overwrites to restore.
+        return not self.users and self.lockdown is None and now - self.last_seen > self.raid_window
+
 
 class SecurityManager:
+    """Shards moderation state per guild.
+
+    ``GuildState`` objects are created on first use and kept in an OrderedDict in
+    activity order, so a lookup is one dict access and guilds without tracked users or
+    recent joins are dropped from the front by ``prune``.
+    """
+
     def __init__(self, config: dict):
         self.config = config
-        self.joins: Deque[datetime] = deque()
-        self.message_history: Dict[int, Deque[datetime]] = defaultdict(deque)
-        self.duplicate_tracker: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
-        self.emoji_tracker: Dict[int, Deque[datetime]] = defaultdict(deque)
-        self.user_scores: Dict[int, int] = defaultdict(int)
+        self.overrides: Dict[int, Dict[str, Any]] = {
+            int(guild_id): dict(values or {}) for guild_id, values in (config.get("guilds") or {}).items()
+        }
+        self._guilds: "OrderedDict[int, GuildState]" = OrderedDict()
+        self.evicted_guilds = 0
+        # Users evicted by guilds that have since been dropped.
+        self.evicted_users = 0
         self.antivirus_hashes = self._load_antivirus_hashes()
 
-    def _load_antivirus_hashes(self) -> set[str]:
-        path = Path(self.config.get("antivirus_hash_db", ""))
-        if path.exists():
-            return {line.strip() for line in path.read_text().splitlines() if line and not line.startswith("#")}
-        return set()
+    def _load_antivirus_hashes(self) -> HashDatabase:
+        return load_hash_database(self.config.get("antivirus_hash_db", DEFAULT_HASH_DB_PATH))
 
-    def record_join(self) -> None:
-        now = datetime.utcnow()
-        self.joins.append(now)
-        window = timedelta(seconds=self.config.get("raid_window_seconds", 30))
-        while self.joins and now - self.joins[0] > window:
-            self.joins.popleft()
+    def guild(self, guild_id: int, now: Optional[float] = None) -> GuildState:
+        now = time.monotonic() if now is None else now
+        state = self._guilds.get(guild_id)
+        if state is None:
+            settings = {**self.config, **self.overrides.get(guild_id, {})}
+            state = self._guilds[guild_id] = GuildState(guild_id, settings, now)
+        else:
+            state.last_seen = now
+            self._guilds.move_to_end(guild_id)
+        return state
 
-    def is_raid(self) -> bool:
-        return len(self.joins) >= self.config.get("raid_threshold", 5)
-
-    def record_message(self, user_id: int, content: str) -> Dict[str, bool]:
-        now = datetime.utcnow()
-        window = timedelta(seconds=self.config.get("spam_window_seconds", 8))
-        history = self.message_history[user_id]
-        history.append(now)
-        while history and now - history[0] > window:
-            history.popleft()
-        spam = len(history) >= self.config.get("spam_threshold", 5)
-
-        duplicates = self.duplicate_tracker[user_id]
-        duplicates[content] += 1
-        flood = duplicates[content] >= self.config.get("flood_duplicate_threshold", 4)
-        for key in list(duplicates.keys()):
-            if duplicates[key] == 0:
-                del duplicates[key]
-
-        emoji_window = self.emoji_tracker[user_id]
-        emoji_window.append(now)
-        while emoji_window and now - emoji_window[0] > window:
-            emoji_window.popleft()
+    def settings(self, guild_id: int) -> Dict[str, Any]:
+        """Effective thresholds of a guild, without creating its state."""
+        state = self._guilds.get(guild_id)
+        return state.settings if state else {**self.config, **self.overrides.get(guild_id, {})}
 
-        return {"spam": spam, "flood": flood}
+    def record_join(self, guild_id: int) -> None:
+        now = time.monotonic()
+        self.guild(guild_id, now).record_join(now)
+
+    def is_raid(self, guild_id: int) -> bool:
+        state = self._guilds.get(guild_id)
+        return state.is_raid() if state else False
+
+    def raided_guilds(self) -> List[int]:
+        now = time.monotonic()
+        return [guild_id for guild_id, state in self._guilds.items() if state.is_raid(now)]
+
+    def record_message(self, guild_id: int, user_id: int, content: str) -> Dict[str, bool]:
+        now = time.monotonic()
+        return self.guild(guild_id, now).record_message(user_id, content, now)
+
+    def suspicious_score(self, guild_id: int, user_id: int, amount: int) -> int:
+        now = time.monotonic()
+        return self.guild(guild_id, now).suspicious_score(user_id, amount, now)
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Evict idle users in every guild, then drop guilds left with nothing to track."""
+        now = time.monotonic() if now is None else now
+        evicted = 0
+        for guild_id in list(self._guilds):
+            state = self._guilds[guild_id]
+            evicted += state.prune(now)
+            if state.idle(now):
+                del self._guilds[guild_id]
+                self.evicted_guilds += 1
+                self.evicted_users += state.evicted_users
+        return evicted
 
-    def suspicious_score(self, user_id: int, amount: int) -> int:
-        self.user_scores[user_id] += amount
-        return self.user_scores[user_id]
+    def stats(self) -> Dict[str, Any]:
+        users = sum(len(state.users) for state in self._guilds.values())
+        sample = next((activity for state in self._guilds.values() for activity in state.users.values()), None)
+        per_user = sample.nbytes() if sample else 0
+        per_guild = sys.getsizeof(OrderedDict()) + sys.getsizeof(deque())
+        return {
+            "tracked_guilds": len(self._guilds),
+            "evicted_guilds": self.evicted_guilds,
+            "tracked_users": users,
+            "evicted_users": self.evicted_users + sum(state.evicted_users for state in self._guilds.values()),
+            "approx_bytes": sys.getsizeof(self._guilds)
+            + len(self._guilds) * per_guild
+            + users * (per_user + sys.getsizeof(0)),
+        }
 
     async def is_malicious_attachment(self, file_bytes: bytes) -> bool:
-        digest = hashlib.sha256(file_bytes).hexdigest()
-        if digest in self.antivirus_hashes:
-            return True
-        # Simulated asynchronous scan placeholder - extend with real API
-        await asyncio.sleep(0)
-        return False
+        # Hash off the event loop: hashlib releases the GIL on large buffers.
+        digest = await asyncio.to_thread(lambda: hashlib.sha256(file_bytes).digest())
+        return digest in self.antivirus_hashes
 
     @staticmethod
     def caps_ratio(content: str) -> float:
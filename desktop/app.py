@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import asyncio
+import json
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict
 
 from PySide6 import QtCore, QtWidgets
 
@@ -53,11 +54,19 @@ class DesktopController(QtCore.QObject):
         async with session.post(f"{LICENSE_API}/licenses/validate", json=payload) as resp:
             return await resp.json()
 
-    async def fetch_licenses(self, token: str):
+    async def iter_licenses(self, token: str, **filters: str) -> AsyncIterator[Dict[str, Any]]:
+        """Stream licenses as NDJSON so the UI can render rows as they arrive."""
         session = await self.ensure_session()
         headers = {"Authorization": f"Bearer {token}"}
-        async with session.get(f"{LICENSE_API}/licenses", headers=headers) as resp:
-            return await resp.json()
+        params = {"format": "ndjson", **filters}
+        async with session.get(f"{LICENSE_API}/licenses", headers=headers, params=params) as resp:
+            resp.raise_for_status()
+            async for line in resp.content:
+                if line.strip():
+                    yield json.loads(line)
+
+    async def fetch_licenses(self, token: str, **filters: str):
+        return [license_data async for license_data in self.iter_licenses(token, **filters)]
 
     async def create_license(self, token: str, payload: Dict[str, Any]):
         session = await self.ensure_session()
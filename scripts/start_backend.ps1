@@ -2,4 +2,5 @@ $ScriptDir = Split-Path -Path $MyInvocation.MyCommand.Definition -Parent
 $RootDir = Resolve-Path "$ScriptDir/.."
 $venv = Join-Path $RootDir "venv_backend"
 & "$venv/Scripts/activate.ps1"
-uvicorn backend.app:app --host 0.0.0.0 --port 8000
+$workers = if ($env:ULB_WORKERS) { [int]$env:ULB_WORKERS } else { 1 }
+uvicorn backend.app:app --host 0.0.0.0 --port 8000 --workers $workers
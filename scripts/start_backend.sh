@@ -3,4 +3,9 @@ set -euo pipefail
 SCRIPT_DIR=$(cd -- "$(dirname "${BASH_SOURCE[0]}")" &> /dev/null && pwd)
 ROOT_DIR=$(cd "$SCRIPT_DIR/.." && pwd)
 source "$ROOT_DIR/venv_backend/bin/activate"
+WORKERS="${ULB_WORKERS:-1}"
+if [ "$WORKERS" -gt 1 ]; then
+    cd "$ROOT_DIR"
+    exec gunicorn -c backend/gunicorn_conf.py backend.app:app
+fi
 uvicorn backend.app:app --host 0.0.0.0 --port 8000